@@ -8,11 +8,15 @@ Tech:
 - FAISS Vector Store
 - Hugging Face LLM (Mistral-7B)
 - Gradio UI
+- Prometheus-style metrics at http://<host>:METRICS_PORT/metrics (default 9100)
+- SHOW_TIMINGS=1 adds the per-stage latency breakdown to each answer (debugging)
 """
 
+import os
 import gradio as gr
 import logging
 from scripts.rag_pipeline import CreditRAG
+from src.metrics import start_metrics_server, DEFAULT_METRICS_PORT
 
 # -------------------------------------------------------------------
 # Logging Configuration
@@ -33,6 +37,16 @@ except Exception as e:
     rag_system = None
     print("❌ Failed to load system. Check logs.")
 
+SHOW_TIMINGS = os.getenv("SHOW_TIMINGS", "").lower() in ("1", "true", "yes")
+
+# Per-stage latency histograms, token counts, cache hits and index size
+metrics_port = int(os.getenv("METRICS_PORT", DEFAULT_METRICS_PORT))
+try:
+    start_metrics_server(port=metrics_port)
+    print(f"📈 Metrics available at http://0.0.0.0:{metrics_port}/metrics")
+except OSError as e:
+    logger.error(f"Metrics server failed to start on port {metrics_port}: {e}")
+
 # -------------------------------------------------------------------
 # 2. Helper Functions
 # -------------------------------------------------------------------
@@ -75,8 +89,15 @@ def query_rag(question, history):
 
     try:
         result = rag_system.answer_question(question)
-        answer = result["answer"]
-        sources = format_sources(result["source_documents"])
+        route_label = "structured aggregates" if result["route"] == "analytics" else "retrieval + generation"
+        footer = f"Answered via {route_label} in {result['latency_ms']:,.0f} ms"
+        if SHOW_TIMINGS:
+            footer += " (" + ", ".join(f"{stage} {ms:,.0f} ms" for stage, ms in result["timings_ms"].items() if stage != "total") + ")"
+        answer = f"{result['answer']}\n\n_{footer}._"
+        if result["route"] == "analytics":
+            sources = "_Computed from pre-aggregated complaint counts (no excerpts needed)._"
+        else:
+            sources = format_sources(result["source_documents"])
         return answer, sources
 
     except Exception as e:
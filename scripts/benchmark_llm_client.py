@@ -0,0 +1,112 @@
+# scripts/benchmark_llm_client.py
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Setup Project Path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm_client import GenerationClient, CircuitBreaker, CircuitOpenError
+from scripts.fake_llm_server import start_fake_server
+
+# --- Setup Logging ---
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark LLM client throughput and tail latency against fake servers.")
+    parser.add_argument("--endpoints", type=str, nargs="+", default=None, help="Existing endpoints to hit. Default: start two local fake servers.")
+    parser.add_argument("--requests", type=int, default=500, help="Total number of requests.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent callers.")
+    parser.add_argument("--deadline", type=float, default=10.0, help="Per-request deadline in seconds.")
+    parser.add_argument("--no_hedge", action="store_true", help="Only use the first endpoint (baseline).")
+    parser.add_argument("--latency_ms", type=float, default=100.0, help="Fake server median latency.")
+    parser.add_argument("--tail_rate", type=float, default=0.05, help="Fake primary slow-tail fraction.")
+    parser.add_argument("--tail_latency_ms", type=float, default=3000.0, help="Fake primary slow-tail latency.")
+    parser.add_argument("--error_rate", type=float, default=0.02, help="Fake primary error fraction.")
+    parser.add_argument("--output", type=str, default=None, help="Optional path for the JSON results.")
+    return parser.parse_args()
+
+def run_benchmark(client, n_requests, concurrency):
+    """Fires n_requests through the client and summarizes latency and outcomes."""
+    def call(i):
+        t0 = time.perf_counter()
+        try:
+            client.generate(f"Benchmark prompt {i}")
+            outcome = "ok"
+        except CircuitOpenError:
+            outcome = "circuit_open"
+        except Exception:
+            outcome = "error"
+        return outcome, (time.perf_counter() - t0) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([ms for _, ms in results])
+    outcomes = [o for o, _ in results]
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(n_requests / elapsed, 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 1),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 1),
+        "latency_p99_ms": round(float(np.percentile(latencies, 99)), 1),
+        "latency_max_ms": round(float(latencies.max()), 1),
+        "ok": outcomes.count("ok"),
+        "errors": outcomes.count("error"),
+        "circuit_open": outcomes.count("circuit_open"),
+        "breaker_state": client.breaker.state,
+    }
+
+def main():
+    args = parse_args()
+
+    servers = []
+    endpoints = args.endpoints
+    if endpoints is None:
+        primary, primary_url = start_fake_server(
+            latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 4,
+            tail_rate=args.tail_rate, tail_latency_ms=args.tail_latency_ms, error_rate=args.error_rate, seed=1
+        )
+        secondary, secondary_url = start_fake_server(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 4, seed=2)
+        servers = [primary, secondary]
+        endpoints = [primary_url, secondary_url]
+        logger.info(f"Started fake servers: {endpoints}")
+
+    if args.no_hedge:
+        endpoints = endpoints[:1]
+
+    client = GenerationClient(
+        endpoints,
+        deadline=args.deadline,
+        pool_size=args.concurrency,
+        breaker=CircuitBreaker(failure_threshold=max(5, args.concurrency), reset_timeout=5.0),
+    )
+    try:
+        results = run_benchmark(client, args.requests, args.concurrency)
+    finally:
+        client.close()
+        for server in servers:
+            server.shutdown()
+
+    results["endpoints"] = len(endpoints)
+    logger.info(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Saved results to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,7 @@ import sys
 import os
 import logging
 import argparse
-import shutil
-import pandas as pd
+import hashlib
 from pathlib import Path
 from tqdm import tqdm
 from langchain_core.documents import Document
@@ -13,6 +12,15 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 
+# --- Setup Project Path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.vector_compression import (
+    VECTOR_DTYPES, DEFAULT_VECTOR_DTYPE, is_compressed, compress_vectorstore, save_compression_config
+)
+from src.sampling import SAMPLE_COLUMNS, build_filter, stream_stratified_sample
+from src.checkpointing import BuildCheckpoint
+
 # --- Setup Logging ---
 logging.basicConfig(
     level=logging.INFO,
@@ -20,31 +28,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Build RAG Vector Store from processed data.")
     parser.add_argument("--input", type=str, default="data/processed/filtered_complaints.parquet", help="Path to input parquet file.")
     parser.add_argument("--output_dir", type=str, default="vector_store/faiss_index", help="Directory for FAISS index.")
     parser.add_argument("--sample_size", type=int, default=12500, help="Target number of complaints to sample.")
+    parser.add_argument("--products", type=str, nargs="+", default=None, help="Only sample these exact Product values.")
+    parser.add_argument("--date_from", type=str, default=None, help="Only sample complaints received on/after this date (YYYY-MM-DD).")
+    parser.add_argument("--date_to", type=str, default=None, help="Only sample complaints received on/before this date (YYYY-MM-DD).")
     parser.add_argument("--chunk_size", type=int, default=500, help="Character limit per chunk.")
     parser.add_argument("--chunk_overlap", type=int, default=50, help="Character overlap between chunks.")
+    parser.add_argument("--vector_dtype", type=str, default=DEFAULT_VECTOR_DTYPE, choices=list(VECTOR_DTYPES), help="Storage precision for vectors (float32, float16, int8).")
+    parser.add_argument("--pca_dim", type=int, default=0, help="Reduce vectors to this dimension with PCA (0 = keep 384).")
+    parser.add_argument("--compression_report", action="store_true", help="Compare memory, latency and recall@5 against the full-precision index.")
     return parser.parse_args()
 
-def load_and_sample(path, target_size):
-    """Loads data and performs stratified sampling."""
-    logger.info(f"Loading data from {path}...")
-    df = pd.read_parquet(path)
-    
-    total_rows = len(df)
-    if total_rows <= target_size:
-        logger.info("Dataset smaller than target sample size. Using full dataset.")
-        return df
+def load_and_sample(path, target_size, products=None, date_from=None, date_to=None):
+    """
+    Streams the Parquet in record batches and performs stratified (by Product)
+    reservoir sampling. Only the columns needed for chunking are read, and the
+    product/date filters are pushed down to the Parquet reader.
+    """
+    logger.info(f"Streaming data from {path}...")
+    filters = build_filter(products, date_from, date_to)
+    sampled_df = stream_stratified_sample(path, target_size, columns=SAMPLE_COLUMNS, filters=filters, seed=42)
 
-    frac = target_size / total_rows
-    logger.info(f"Sampling {target_size} rows (approx {frac:.2%})...")
-    
-    # Stratified sampling by Product
-    sampled_df = df.groupby('Product', group_keys=False).apply(lambda x: x.sample(frac=frac, random_state=42))
-    
     logger.info(f"Final sample size: {len(sampled_df)}")
     return sampled_df
 
@@ -83,51 +93,81 @@ def create_documents(df, chunk_size, chunk_overlap):
     logger.info(f"Generated {len(documents)} chunks from {len(df)} complaints.")
     return documents
 
-def build_vector_store(documents, output_dir):
-    """Embeds documents and saves to FAISS."""
-    
-    # Clear existing vector store if it exists
-    if os.path.exists(output_dir):
-        logger.warning(f"Removing existing vector store at {output_dir}")
-        shutil.rmtree(output_dir)
-        
-    logger.info("Initializing Embedding Model (all-MiniLM-L6-v2)...")
-    embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    
+def documents_fingerprint(documents, batch_size, model_name=EMBEDDING_MODEL):
+    """Hashes chunk texts and metadata so a checkpoint is only reused for identical inputs."""
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(doc.page_content.encode("utf-8"))
+        digest.update(repr(sorted(doc.metadata.items())).encode("utf-8"))
+    return {"documents": digest.hexdigest(), "count": len(documents), "batch_size": batch_size, "model": model_name}
+
+def build_vector_store(documents, output_dir, vector_dtype=DEFAULT_VECTOR_DTYPE, pca_dim=0, compression_report=False, batch_size=1000, embedding_model=None):
+    """
+    Embeds documents, optionally compresses the vectors, and saves to FAISS.
+
+    Every embedded batch is checkpointed to `<output_dir>.partial/`, so an
+    interrupted run resumes from the last completed batch. The finished index
+    is swapped in atomically; the previous store stays served until then.
+    """
+    if embedding_model is None:
+        logger.info(f"Initializing Embedding Model ({EMBEDDING_MODEL})...")
+        embedding_model = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+
+    model_name = getattr(embedding_model, "model_name", type(embedding_model).__name__)
+    checkpoint = BuildCheckpoint(output_dir, documents_fingerprint(documents, batch_size, model_name))
+
     logger.info(f"Creating FAISS index at {output_dir}. This may take a while...")
 
-        # --- BATCHING LOGIC START ---
-    batch_size = 1000 # Process 1000 chunks at a time
+    # --- BATCHING LOGIC START ---
     total_docs = len(documents)
+    batch_starts = range(0, total_docs, batch_size)
 
-        # Initialize FAISS with the first batch to create the structure
-    logger.info("Initializing index with first batch...")
-    vectorstore = FAISS.from_documents(documents[:batch_size], embedding_model)
+    # 1. Embed (skipping batches already checkpointed by a previous run)
+    for batch_idx, i in enumerate(tqdm(batch_starts, desc="Embedding Batches")):
+        if checkpoint.has_embeddings(batch_idx):
+            continue
+        texts = [d.page_content for d in documents[i : i + batch_size]]
+        checkpoint.save_embeddings(batch_idx, embedding_model.embed_documents(texts))
 
-        # Process the rest in batches
-    # We start from batch_size because we already did the first 0-1000
-    for i in tqdm(range(batch_size, total_docs, batch_size), desc="Embedding Batches"):
+    # 2. Assemble the index from the checkpointed embeddings
+    vectorstore = None
+    for batch_idx, i in enumerate(batch_starts):
         batch = documents[i : i + batch_size]
-        vectorstore.add_documents(batch)
+        text_embeddings = list(zip([d.page_content for d in batch], checkpoint.load_embeddings(batch_idx).tolist()))
+        metadatas = [d.metadata for d in batch]
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(text_embeddings, embedding_model, metadatas=metadatas)
+        else:
+            vectorstore.add_embeddings(text_embeddings, metadatas=metadatas)
     # --- BATCHING LOGIC END ---
 
-    # Save Locally
-    vectorstore.save_local(output_dir)
+    # Reduce precision / dimension of the stored vectors
+    report = None
+    if is_compressed(vector_dtype, pca_dim):
+        logger.info(f"Compressing vectors (dtype={vector_dtype}, pca_dim={pca_dim or 'off'})...")
+        report = compress_vectorstore(vectorstore, vector_dtype, pca_dim, report=compression_report)
+        if report:
+            logger.info(f"Compression report: {report}")
+
+    # Save to staging, then swap in atomically
+    vectorstore.save_local(str(checkpoint.final_dir))
+    save_compression_config(checkpoint.final_dir, vector_dtype, pca_dim, report)
+    release = checkpoint.publish()
     
-    logger.info("Vector store created and persisted successfully.")
+    logger.info(f"Vector store created and persisted successfully ({release}).")
     return vectorstore
 
 def main():
     args = parse_args()
     
     # 1. Load & Sample
-    df = load_and_sample(args.input, args.sample_size)
+    df = load_and_sample(args.input, args.sample_size, args.products, args.date_from, args.date_to)
     
     # 2. Chunk
     documents = create_documents(df, args.chunk_size, args.chunk_overlap)
     
     # 3. Embed & Store
-    build_vector_store(documents, args.output_dir)
+    build_vector_store(documents, args.output_dir, args.vector_dtype, args.pca_dim, args.compression_report)
     
     logger.info("Task 2 Pipeline Complete.")
 
@@ -0,0 +1,116 @@
+# scripts/fake_llm_server.py
+"""
+Local stand-in for an OpenAI-compatible chat-completions endpoint.
+
+Accepts the same POST payload as the HF router / TGI Messages API on any path
+({"model": ..., "messages": [...], ...}) and answers with
+{"choices": [{"message": {"role": "assistant", "content": ...}}], "usage": {...}} after a
+configurable latency, with optional slow-tail requests and injected errors. Used to benchmark the LLM client
+offline (see benchmark_llm_client.py).
+"""
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Setup Logging ---
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a fake chat-completions server for offline benchmarks.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to bind.")
+    parser.add_argument("--port", type=int, default=8081, help="Port to listen on.")
+    parser.add_argument("--latency_ms", type=float, default=200.0, help="Median response latency in ms.")
+    parser.add_argument("--jitter_ms", type=float, default=50.0, help="Std-dev of normally distributed latency jitter in ms.")
+    parser.add_argument("--tail_rate", type=float, default=0.0, help="Fraction of requests that hit the slow tail.")
+    parser.add_argument("--tail_latency_ms", type=float, default=5000.0, help="Latency of slow-tail requests in ms.")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    return parser.parse_args()
+
+def make_handler(latency_ms=200.0, jitter_ms=50.0, tail_rate=0.0, tail_latency_ms=5000.0, error_rate=0.0, seed=42):
+    """Builds a request handler class with the given latency/error profile."""
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    class FakeGenerationHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like real inference servers
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Client gave up (deadline or losing hedge)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+
+            with rng_lock:
+                slow = rng.random() < tail_rate
+                failed = rng.random() < error_rate
+                delay_ms = tail_latency_ms if slow else max(0.0, rng.gauss(latency_ms, jitter_ms))
+            time.sleep(delay_ms / 1000)
+
+            if failed:
+                self._send_json(503, {"error": "Injected failure"})
+                return
+            prompt = "".join(str(m.get("content", "")) for m in request.get("messages", []))
+            content = f"Stub answer ({len(prompt)} prompt chars, {delay_ms:.0f} ms)."
+            self._send_json(200, {
+                "object": "chat.completion",
+                "model": request.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                # Whitespace "tokens", so callers can check the counts they record
+                "usage": {
+                    "prompt_tokens": len(prompt.split()),
+                    "completion_tokens": len(content.split()),
+                    "total_tokens": len(prompt.split()) + len(content.split()),
+                },
+            })
+
+        def do_GET(self):
+            self._send_json(200, {"status": "ok"})
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+    return FakeGenerationHandler
+
+def start_fake_server(host="127.0.0.1", port=0, **profile):
+    """Starts the server on a background thread. Returns (server, base_url); port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), make_handler(**profile))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1/chat/completions"
+
+def main():
+    args = parse_args()
+    server = ThreadingHTTPServer(
+        (args.host, args.port),
+        make_handler(args.latency_ms, args.jitter_ms, args.tail_rate, args.tail_latency_ms, args.error_rate, args.seed)
+    )
+    server.daemon_threads = True
+    logger.info(f"Fake chat-completions server listening on http://{args.host}:{args.port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.warning("Interrupted by user. Shutting down.")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
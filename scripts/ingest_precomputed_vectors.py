@@ -1,5 +1,6 @@
 # scripts/ingest_precomputed_vectors.py
 import os
+import sys
 import logging
 import argparse
 import pandas as pd
@@ -7,6 +8,14 @@ from tqdm import tqdm
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 
+# --- Setup Project Path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.checkpointing import BuildCheckpoint, file_fingerprint
+from src.vector_compression import (
+    VECTOR_DTYPES, DEFAULT_VECTOR_DTYPE, is_compressed, compress_vectorstore, save_compression_config
+)
+
 # --- Setup Logging ---
 logging.basicConfig(
     level=logging.INFO, 
@@ -21,6 +30,10 @@ def parse_args():
     parser.add_argument("--input", type=str, default="data/processed/complaint_embeddings.parquet", help="Path to pre-computed parquet.")
     parser.add_argument("--output_dir", type=str, default="vector_store/full_faiss_index", help="Output FAISS index directory.")
     parser.add_argument("--batch_size", type=int, default=50000, help="Number of rows to process per batch.")
+    parser.add_argument("--checkpoint_every", type=int, default=5, help="Checkpoint the partial index every N batches.")
+    parser.add_argument("--vector_dtype", type=str, default=DEFAULT_VECTOR_DTYPE, choices=list(VECTOR_DTYPES), help="Storage precision for vectors (float32, float16, int8).")
+    parser.add_argument("--pca_dim", type=int, default=0, help="Reduce vectors to this dimension with PCA (0 = keep 384).")
+    parser.add_argument("--compression_report", action="store_true", help="Compare memory, latency and recall@5 against the full-precision index.")
     return parser.parse_args()
 
 def main():
@@ -55,14 +68,19 @@ def main():
     logger.info("Initializing Embedding Model wrapper (all-MiniLM-L6-v2)...")
     embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
 
-    # 5. Batch Processing
+    # 5. Batch Processing (resumes from the last checkpointed batch, if any)
     total_rows = len(df)
-    vectorstore = None
+    checkpoint = BuildCheckpoint(
+        args.output_dir,
+        {"input": file_fingerprint(args.input), "batch_size": args.batch_size}
+    )
+    vectorstore = checkpoint.load_index(embedding_model)
+    start_row = checkpoint.completed if vectorstore is not None else 0
     
-    logger.info(f"Starting ingestion in batches of {args.batch_size}...")
+    logger.info(f"Starting ingestion in batches of {args.batch_size} from row {start_row:,}...")
 
     try:
-        for i in tqdm(range(0, total_rows, args.batch_size), desc="Indexing Batches"):
+        for batch_no, i in enumerate(tqdm(range(start_row, total_rows, args.batch_size), desc="Indexing Batches"), start=1):
             # Slice the dataframe
             batch = df.iloc[i : i + args.batch_size]
             
@@ -87,14 +105,28 @@ def main():
                     text_embeddings=text_embeddings,
                     metadatas=metadatas
                 )
+
+            # Periodically persist the partial index so a crash only loses the last few batches
+            if batch_no % args.checkpoint_every == 0:
+                checkpoint.save_index(vectorstore, completed=i + len(batch))
         
-        # 6. Save
+        # 6. Reduce precision / dimension of the stored vectors
+        report = None
+        if is_compressed(args.vector_dtype, args.pca_dim):
+            logger.info(f"Compressing vectors (dtype={args.vector_dtype}, pca_dim={args.pca_dim or 'off'})...")
+            report = compress_vectorstore(vectorstore, args.vector_dtype, args.pca_dim, report=args.compression_report)
+            if report:
+                logger.info(f"Compression report: {report}")
+
+        # 7. Save to staging, then swap in atomically
         logger.info(f"Saving full index to {args.output_dir}...")
-        vectorstore.save_local(args.output_dir)
-        logger.info("✅ Ingestion complete. Vector store ready.")
+        vectorstore.save_local(str(checkpoint.final_dir))
+        save_compression_config(checkpoint.final_dir, args.vector_dtype, args.pca_dim, report)
+        release = checkpoint.publish()
+        logger.info(f"✅ Ingestion complete. Vector store ready ({release}).")
 
     except Exception as e:
-        logger.critical(f"Process failed during ingestion: {e}")
+        logger.critical(f"Process failed during ingestion: {e}. Re-run to resume from the last checkpoint.")
         raise
 
 if __name__ == "__main__":
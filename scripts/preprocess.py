@@ -13,6 +13,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 try:
     from src.data_loading import load_and_filter_complaints
     from src.cleaning import clean_narrative
+    from src.analytics import build_aggregates, save_aggregates
 except ImportError as e:
     print(f"CRITICAL ERROR: Could not import modules. {e}")
     print("Ensure you are running this script from the project root or 'scripts/' folder.")
@@ -109,6 +110,19 @@ def main():
             logger.error(f"Failed to save output files. Check permissions or disk space. Error: {e}")
             sys.exit(1)
         
+        # --- Step 4: Structured Aggregates ---
+        # Counts over product/sub-product/issue/company/state/month let CreditRAG
+        # answer "how many" and trend questions without retrieval or the LLM.
+        logger.info("Building complaint aggregates...")
+        
+        try:
+            aggregates = build_aggregates(df)
+            aggregates_path = save_aggregates(aggregates, output_dir)
+            logger.info(f"Saved Aggregates: {aggregates_path} ({len(aggregates):,} groups)")
+        except (IOError, OSError) as e:
+            logger.error(f"Failed to save aggregates. Error: {e}")
+            sys.exit(1)
+        
         # --- Final Stats ---
         elapsed = (time.time() - start_time) / 60
         logger.info(f"Pipeline finished successfully in {elapsed:.1f} minutes.")
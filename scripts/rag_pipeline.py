@@ -1,19 +1,28 @@
 # scripts/rag_pipeline.py
 import argparse
 import os
+import sys
 import logging
+import threading
+import numpy as np
+from collections import OrderedDict
 from dotenv import load_dotenv
 
 # LangChain Imports
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 
-# from langchain_huggingface import HuggingFaceEndpoint
-# from langchain_huggingface import ChatHuggingFace
-from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
 from langchain_core.prompts import PromptTemplate
 # Removed unused import: from langchain.chains import LLMChain
 
+# --- Setup Project Path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.vector_compression import load_compression_config, index_memory_bytes
+from src.analytics import ComplaintAggregates
+from src.llm_client import GenerationClient, CircuitOpenError, DEFAULT_ENDPOINT_URL
+from src.metrics import REGISTRY, DEFAULT_TOKEN_BUCKETS, StageTimer
+
 # Load environment variables
 load_dotenv()
 
@@ -21,17 +30,54 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Metrics (exposed by app.py at /metrics)
+STAGE_LATENCY = REGISTRY.histogram(
+    "creditrag_stage_latency_seconds", "Latency of each CreditRAG pipeline stage.", ["stage"])
+REQUEST_LATENCY = REGISTRY.histogram(
+    "creditrag_request_latency_seconds", "End-to-end answer_question latency.", ["route"])
+REQUESTS = REGISTRY.counter("creditrag_requests_total", "Questions answered, by route.", ["route"])
+LLM_CALLS = REGISTRY.counter("creditrag_llm_calls_total", "LLM generation attempts, by outcome.", ["outcome"])
+TOKENS = REGISTRY.histogram(
+    "creditrag_llm_tokens", "LLM tokens per request, from the endpoint's usage block (source=usage) "
+    "or ~4 characters per token if it sent none (source=estimate).", ["kind", "source"],
+    buckets=DEFAULT_TOKEN_BUCKETS)
+CACHE_LOOKUPS = REGISTRY.counter("creditrag_cache_lookups_total", "Cache lookups, by cache and result.", ["cache", "result"])
+INDEX_VECTORS = REGISTRY.gauge("creditrag_index_vectors", "Vectors in the loaded FAISS index.")
+INDEX_BYTES = REGISTRY.gauge("creditrag_index_bytes", "Approximate memory of the loaded FAISS vectors.")
+
+EMBED_CACHE_SIZE = 1024
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token); fallback when the endpoint reports no usage."""
+    return max(1, len(text) // 4)
+
+def record_token_usage(prompt, completion, usage=None):
+    """Records prompt/completion token counts, preferring the endpoint's `usage` block."""
+    for kind, text in (("prompt", prompt), ("completion", completion)):
+        count = (usage or {}).get(f"{kind}_tokens")
+        if isinstance(count, int):
+            TOKENS.observe(count, kind=kind, source="usage")
+        else:
+            TOKENS.observe(estimate_tokens(text), kind=kind, source="estimate")
+
 class CreditRAG:
-    def __init__(self, vector_store_path="vector_store/full_faiss_index"):
+    def __init__(self, vector_store_path="vector_store/full_faiss_index",
+                 aggregates_path="data/processed/complaint_aggregates.parquet",
+                 embedding_model=None, llm=None):
         """
-        Initializes the RAG pipeline: loads the vector store and sets up the LLM.
+        Initializes the RAG pipeline: loads the vector store, the structured
+        aggregates (for count/trend questions) and sets up the LLM.
+        `embedding_model` and `llm` may be injected (e.g. stubs for offline benchmarks).
         """
         self.vector_store_path = vector_store_path
         self.repo_id = "mistralai/Mistral-7B-Instruct-v0.2"
+        self.top_k = 5
+        self._embed_cache = OrderedDict()
+        self._embed_cache_lock = threading.Lock()
         
         # 1. Initialize Embedding Model
         logger.info("Loading Embedding Model...")
-        self.embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        self.embedding_model = embedding_model or HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
 
         # 2. Load Vector Store
         logger.info(f"Loading Vector Store from {self.vector_store_path}...")
@@ -41,26 +87,49 @@ class CreditRAG:
                 self.embedding_model,
                 allow_dangerous_deserialization=True
             )
-            self.retriever = self.vector_db.as_retriever(search_kwargs={"k": 5})
-            logger.info("Vector Store Loaded Successfully.")
+            # Reduced-precision / PCA indexes carry their transform inside the FAISS index
+            # (IndexPreTransform), so query vectors get the same projection at search time.
+            self.index_config = load_compression_config(self.vector_store_path)
+            if self.vector_db.index.d != len(self.embedding_model.embed_query("dimension check")):
+                raise ValueError("Embedding model dimension does not match the vector store input dimension.")
+            INDEX_VECTORS.set(self.vector_db.index.ntotal)
+            INDEX_BYTES.set(index_memory_bytes(self.vector_db.index))
+            logger.info(f"Vector Store Loaded Successfully ({self.index_config['factory']}, {self.vector_db.index.ntotal:,} vectors).")
         except Exception as e:
             logger.error(f"Failed to load Vector Store: {e}")
             raise
 
+        # 2b. Load Structured Aggregates (optional fast path)
+        self.aggregates = None
+        if aggregates_path and os.path.exists(aggregates_path):
+            logger.info(f"Loading complaint aggregates from {aggregates_path}...")
+            self.aggregates = ComplaintAggregates.load(aggregates_path)
+        elif aggregates_path:
+            logger.warning(f"Aggregates not found at {aggregates_path}. All questions will use retrieval + generation.")
+
         # 3. Initialize LLM (UPDATED SECTION)
         logger.info("Initializing LLM Endpoint...")
+        self.llm = llm
 
-        hf_llm = HuggingFaceEndpoint(
-            repo_id=self.repo_id,
-            task="text-generation",
-            max_new_tokens=512,
-            temperature=0.1,
-            do_sample=True,
-            timeout=300,
-        )
-
-        self.llm = ChatHuggingFace(llm=hf_llm)
+        # Pooled keep-alive client with a per-request deadline, hedging to an optional
+        # second endpoint, and a circuit breaker that fails fast while the API is down.
+        if self.llm is None:
+            endpoints = [os.getenv("LLM_ENDPOINT_URL") or DEFAULT_ENDPOINT_URL]
+            if os.getenv("LLM_HEDGE_ENDPOINT_URL"):
+                endpoints.append(os.getenv("LLM_HEDGE_ENDPOINT_URL"))
+            token = os.getenv("HUGGINGFACEHUB_API_TOKEN")
+            if endpoints[0] == DEFAULT_ENDPOINT_URL and not token:
+                logger.error("HUGGINGFACEHUB_API_TOKEN is not set; the Hugging Face router will reject every "
+                             "generation call. Set it (or LLM_ENDPOINT_URL) in .env.")
 
+            self.llm = GenerationClient(
+                endpoints,
+                model=os.getenv("LLM_MODEL", self.repo_id),
+                token=token,
+                max_new_tokens=512,
+                temperature=0.1,
+                deadline=float(os.getenv("LLM_DEADLINE_SECONDS", 30)),
+            )
 
         # 4. Define Prompt Template
         self.prompt_template = PromptTemplate(
@@ -84,9 +153,59 @@ class CreditRAG:
             input_variables=["context", "question"]
         )
 
-    def retrieve_documents(self, query):
-        """Retrieve relevant documents for a query."""
-        return self.retriever.invoke(query)
+    def _embed_query(self, query):
+        """Embeds the query, reusing recent embeddings of identical questions."""
+        with self._embed_cache_lock:
+            vector = self._embed_cache.get(query)
+            if vector is not None:
+                self._embed_cache.move_to_end(query)
+        CACHE_LOOKUPS.inc(cache="query_embedding", result="hit" if vector is not None else "miss")
+        if vector is not None:
+            return vector
+
+        vector = self.embedding_model.embed_query(query)
+        with self._embed_cache_lock:
+            self._embed_cache[query] = vector
+            if len(self._embed_cache) > EMBED_CACHE_SIZE:
+                self._embed_cache.popitem(last=False)
+        return vector
+
+    def retrieve_documents(self, query, timer=None):
+        """
+        Retrieve relevant documents for a query.
+        Top-k similarity search over the FAISS index (like `vector_db.similarity_search`),
+        split into timed embed / search / fetch stages.
+        """
+        timer = timer or StageTimer(STAGE_LATENCY)
+
+        with timer.span("embed"):
+            vector = self._embed_query(query)
+
+        with timer.span("search"):
+            _, ids = self.vector_db.index.search(np.array([vector], dtype=np.float32), self.top_k)
+
+        with timer.span("fetch"):
+            docs = []
+            for i in ids[0]:
+                if i == -1:
+                    continue
+                doc = self.vector_db.docstore.search(self.vector_db.index_to_docstore_id[i])
+                if not isinstance(doc, str):  # docstore returns an error string for missing ids
+                    docs.append(doc)
+        return docs
+
+    def route_query(self, query):
+        """
+        Returns a parsed analytics intent for count/trend/breakdown questions,
+        or None if the question should go through retrieval + generation.
+        """
+        if self.aggregates is None:
+            return None
+        try:
+            return self.aggregates.parse(query)
+        except Exception as e:
+            logger.error(f"Query routing failed, falling back to RAG: {e}")
+            return None
 
     # def answer_question(self, query):
     #     """
@@ -108,33 +227,83 @@ class CreditRAG:
     #         "source_documents": docs
     #     }
     def answer_question(self, query):
+        """
+        Routes the question: aggregate/trend questions are answered from the
+        pre-computed counts, everything else runs the full RAG pipeline.
+        """
+        timer = StageTimer(STAGE_LATENCY)
+        with timer.span("route"):
+            intent = self.route_query(query)
+
+        result = None
+        if intent is not None:
+            try:
+                with timer.span("aggregate"):
+                    answer_text = self.aggregates.answer(intent)
+                result = {
+                    "question": query,
+                    "answer": answer_text,
+                    "source_documents": [],
+                    "route": "analytics",
+                }
+            except Exception as e:
+                logger.error(f"Analytics answer failed, falling back to RAG: {e}")
+        if result is None:
+            result = self._answer_with_rag(query, timer)
+
+        result["latency_ms"] = round(timer.total_ms(), 1)
+        result["timings_ms"] = {**timer.timings_ms, "total": timer.total_ms()}
+        REQUESTS.inc(route=result["route"])
+        REQUEST_LATENCY.observe(result["latency_ms"] / 1000, route=result["route"])
+        logger.info(f"Answered via {result['route']} in {result['latency_ms']:.1f} ms {result['timings_ms']}")
+        return result
+
+    def _answer_with_rag(self, query, timer):
         """
         Full RAG pipeline: Retrieve -> Format -> Generate
         """
         # 1. Retrieve (Local - This should always work)
         try:
-            docs = self.retrieve_documents(query)
+            docs = self.retrieve_documents(query, timer)
         except Exception as e:
             logger.error(f"Retrieval failed: {e}")
             return {
                 "question": query,
                 "answer": "Error: Could not retrieve documents from the local vector store.",
-                "source_documents": []
+                "source_documents": [],
+                "route": "rag",
             }
         
         # 2. Combine context
-        context_text = "\n\n".join([d.page_content for d in docs])
+        with timer.span("context"):
+            context_text = "\n\n".join([d.page_content for d in docs])
+            # Sent as the user message; the endpoint applies the model's chat template
+            prompt = self.prompt_template.format(context=context_text, question=query).strip()
         
         # 3. Generate (Remote API - This might fail due to network/timeout)
         try:
-            chain = self.prompt_template | self.llm
-            response = chain.invoke({"context": context_text, "question": query})
-            answer_text = response.content.strip()
+            with timer.span("generate"):
+                if hasattr(self.llm, "generate_with_usage"):
+                    answer_text, usage = self.llm.generate_with_usage(prompt)
+                else:  # injected LLMs (e.g. StubLLM) may only implement generate()
+                    answer_text, usage = self.llm.generate(prompt), None
+                answer_text = answer_text.strip()
+            LLM_CALLS.inc(outcome="ok")
+            record_token_usage(prompt, answer_text, usage)
+        except CircuitOpenError:
+            LLM_CALLS.inc(outcome="circuit_open")
+            logger.warning("LLM circuit open; returning retrieval-only answer.")
+            answer_text = (
+                "⚠️ **LLM Unavailable**: The language model is temporarily unavailable.\n\n"
+                "The **Retrieval System** is working correctly. "
+                "Please check the 'Reference Sources' below to see the data found for your query."
+            )
         except Exception as e:
+            LLM_CALLS.inc(outcome="error")
             logger.error(f"LLM Generation failed: {e}")
             # Fallback message so the UI doesn't crash
             answer_text = (
-                "⚠️ **Network Error**: The Hugging Face Inference API timed out.\n\n"
+                "⚠️ **Network Error**: The Hugging Face Inference API did not answer in time.\n\n"
                 "However, the **Retrieval System** is working correctly. "
                 "Please check the 'Reference Sources' below to see the data found for your query."
             )
@@ -142,7 +311,8 @@ class CreditRAG:
         return {
             "question": query,
             "answer": answer_text,
-            "source_documents": docs
+            "source_documents": docs,
+            "route": "rag",
         }
 def parse_args():
     parser = argparse.ArgumentParser(description="Run the CrediTrust RAG pipeline from CLI.")
@@ -160,6 +330,8 @@ if __name__ == "__main__":
     print("-" * 50)
     print(f"Question: {result['question']}")
     print(f"Answer: {result['answer']}")
+    print(f"Route: {result['route']} ({result['latency_ms']:.1f} ms)")
+    print(f"Timings (ms): {result['timings_ms']}")
     print("-" * 50)
     print("Sources:")
     for doc in result['source_documents']:
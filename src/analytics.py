@@ -0,0 +1,363 @@
+# src/analytics.py
+import re
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Define constants for defaults
+DIMENSIONS = ['Product', 'Sub-product', 'Issue', 'Company', 'State', 'month']
+DEFAULT_AGGREGATES_FILENAME = "complaint_aggregates.parquet"
+
+# Question keywords -> regex over the 'Product' column (mirrors DEFAULT_TARGET_PATTERN)
+PRODUCT_ALIASES = {
+    "credit card": r"(?i)credit card",
+    "prepaid card": r"(?i)prepaid card",
+    "personal loan": r"(?i)personal loan",
+    "savings": r"(?i)savings account",
+    "money transfer": r"(?i)money transfer",
+}
+
+COUNT_PATTERN = re.compile(r"\b(how many|number of|count of|total complaints|volume of)\b", re.I)
+TREND_PATTERN = re.compile(r"\b(trends?|trending|over time|per month|by month|monthly|month[- ]over[- ]month)\b", re.I)
+BREAKDOWN_PATTERN = re.compile(
+    r"\b(?:top \d+|which|most common|breakdown(?: by)?|by)\s+"
+    r"(compan(?:y|ies)|states?|issues?|sub-products?|products?)\b",
+    re.I,
+)
+TOPIC_PATTERN = re.compile(
+    r"\b(?:about|regarding|related to|involving|concerning)\s+([a-z][a-z \-]*?)"
+    r"(?=\s+(?:in|during|last|this|since|between|from|per|by|at|with|were|was|have|has)\b|[?.!,]|$)",
+    re.I,
+)
+COMPANY_SUFFIX_WORDS = r"corporation|corp|incorporated|inc|company|co|llc|n\.?a|national association|financial|holdings|group"
+COMPANY_SUFFIXES = re.compile(rf"[,.&]|\b({COMPANY_SUFFIX_WORDS})\b", re.I)
+# A two-letter code only counts as a state where the question puts it: after a
+# preposition ("in CA", "from TX, NY or FL") or before a noun ("CA complaints").
+# Bare codes are ordinary words ("credit cards OR prepaid cards", "is that OK").
+STATE_CODE_LIST = r"[A-Z]{2}(?:\s*(?:,|and|or)\s*[A-Z]{2})*"
+STATE_CONTEXT_PATTERN = re.compile(
+    rf"\b(?i:in|from|across|within)\s+(?i:the state of\s+)?({STATE_CODE_LIST})\b"
+    rf"|\b({STATE_CODE_LIST})\s+(?=(?i:complaints?|consumers?|customers?|residents?)\b)"
+)
+# Question scaffolding that carries no filter. Any other word left unconsumed
+# after parsing means the question asks for something the aggregates can't express.
+FILLER_WORDS = frozenset("""
+    a an the of for in on at to from by with and or s it its there
+    is are was were be been do does did have has had
+    how what which who where when show me give list tell get see display plot chart please
+    about regarding related involving concerning per across all each any between during since so far
+    complaints complaint consumers consumer customers customer cfpb
+    filed received submitted reported made raised logged total overall number count many much
+    most common top highest biggest largest frequent companies company states state issues issue
+    products product values value ranked rank breakdown
+    trend trends change changed changing look like over time month months monthly
+    account accounts
+""".split())
+BREAKDOWN_COLUMNS = {
+    "compan": "Company", "state": "State", "issue": "Issue",
+    "sub-product": "Sub-product", "product": "Product",
+}
+MONTHS = {m.lower(): i for i, m in enumerate(
+    ["January", "February", "March", "April", "May", "June", "July",
+     "August", "September", "October", "November", "December"], start=1)}
+
+
+def build_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pre-computes complaint counts over product, sub-product, issue, company, state and month.
+
+    Args:
+        df (pd.DataFrame): Processed complaints (output of preprocess.py).
+
+    Returns:
+        pd.DataFrame: One row per distinct dimension combination with a 'count' column.
+    """
+    cube = df[[c for c in DIMENSIONS if c != 'month']].copy()
+    cube = cube.fillna("Unknown")
+    cube['month'] = (
+        pd.to_datetime(df['Date received'], errors='coerce')
+        .dt.to_period('M').astype(str)
+        .replace('NaT', 'Unknown')
+    )
+    return cube.groupby(DIMENSIONS, observed=True).size().reset_index(name='count')
+
+
+def save_aggregates(aggregates: pd.DataFrame, output_dir: Path) -> Path:
+    """Writes the aggregates to Parquet with categorical (dictionary-encoded) columns."""
+    path = Path(output_dir) / DEFAULT_AGGREGATES_FILENAME
+    aggregates.astype({c: 'category' for c in DIMENSIONS}).to_parquet(path, index=False)
+    return path
+
+
+def _normalize_company(name: str) -> str:
+    return re.sub(r"\s+", " ", COMPANY_SUFFIXES.sub(" ", name.lower())).strip()
+
+
+def _consume(rest: List[str], span: Tuple[int, int]) -> None:
+    """Blanks out a matched span of the question so its words count as understood."""
+    rest[span[0]:span[1]] = " " * (span[1] - span[0])
+
+
+def _consume_all(rest: List[str], pattern: str, text: str) -> bool:
+    """Consumes every match of `pattern` in `text`. Returns True if there was at least one."""
+    matches = list(re.finditer(pattern, text))
+    for m in matches:
+        _consume(rest, m.span())
+    return bool(matches)
+
+
+def _content_words(text: str) -> List[str]:
+    return [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in FILLER_WORDS]
+
+
+class ComplaintAggregates:
+    """
+    Answers count, trend and breakdown questions from the pre-computed aggregates.
+
+    Relative dates ('last quarter', 'last month') are resolved against the most
+    recent month present in the data, not the wall clock.
+    """
+
+    def __init__(self, aggregates: pd.DataFrame):
+        self.df = aggregates.astype({c: 'category' for c in DIMENSIONS})
+        months = sorted(m for m in self.df['month'].cat.categories if m != 'Unknown')
+        self.latest_month = pd.Period(months[-1], freq='M') if months else None
+        self.issues = list(self.df['Issue'].cat.categories)
+        self.sub_products = [s for s in self.df['Sub-product'].cat.categories if len(s) >= 5 and s != "Unknown"]
+        self.states = set(self.df['State'].cat.categories)
+        self.companies: Dict[str, List[str]] = {}
+        for name in self.df['Company'].cat.categories:
+            key = _normalize_company(name)
+            if len(key) >= 4:
+                self.companies.setdefault(key, []).append(name)
+
+        # One precompiled alternation per dimension (longest names first), so parse()
+        # runs one search per dimension instead of one regex per company / issue.
+        self._company_pattern = self._alternation(
+            self.companies, rf"\b(?:{{}})\b(?:[\s,.&']*\b(?:{COMPANY_SUFFIX_WORDS}|s)\b\.?)*")
+        self._sub_product_pattern = self._alternation([s.lower() for s in self.sub_products], "{}")
+        self._issue_pattern = self._alternation([i.lower() for i in self.issues], "{}")
+        self._sub_products_by_key = {s.lower(): s for s in self.sub_products}
+        self._issues_by_key = {i.lower(): i for i in self.issues}
+
+    @staticmethod
+    def _alternation(keys, template: str) -> Optional[re.Pattern]:
+        """Compiles `template` around a capture group matching any of `keys`, longest first."""
+        keys = sorted(keys, key=len, reverse=True)
+        if not keys:
+            return None
+        return re.compile(template.format("(" + "|".join(re.escape(k) for k in keys) + ")"))
+
+    @staticmethod
+    def _consume_matches(rest: List[str], pattern: Optional[re.Pattern], text: str) -> List[str]:
+        """Consumes every match of a precompiled alternation; returns the matched keys in order."""
+        if pattern is None:
+            return []
+        keys = []
+        for m in pattern.finditer(text):
+            _consume(rest, m.span())
+            if m.group(1) not in keys:
+                keys.append(m.group(1))
+        return keys
+
+    @classmethod
+    def load(cls, path) -> "ComplaintAggregates":
+        return cls(pd.read_parquet(path))
+
+    # ------------------------------------------------------------------
+    # Question parsing
+    # ------------------------------------------------------------------
+    def parse(self, question: str) -> Optional[Dict]:
+        """
+        Recognizes aggregate/trend intents and extracts filters.
+
+        Every phrase mapped to an intent, filter or period is consumed from the
+        question. If any content word is left over (e.g. 'late fees', 'BNPL',
+        'worst'), the aggregates cannot answer it faithfully and the question
+        goes to RAG instead.
+
+        Returns:
+            Optional[Dict]: {'intent', 'filters', 'start', 'end', 'group_by'} or None
+            if the question is open-ended or mentions anything we cannot map to a filter.
+        """
+        breakdown = BREAKDOWN_PATTERN.search(question)
+        if TREND_PATTERN.search(question):
+            intent = "trend"
+        elif breakdown:
+            intent = "breakdown"
+        elif COUNT_PATTERN.search(question):
+            intent = "count"
+        else:
+            return None
+
+        q = question.lower()
+        rest = list(q)
+        for pattern in (TREND_PATTERN, BREAKDOWN_PATTERN, COUNT_PATTERN):
+            _consume_all(rest, pattern, q)
+        filters: Dict[str, List[str]] = {}
+
+        products = []
+        for alias, pattern in PRODUCT_ALIASES.items():
+            if _consume_all(rest, rf"\b{re.escape(alias)}s?\b", q):
+                products += [p for p in self.df['Product'].cat.categories if re.search(pattern, p)]
+        if products:
+            filters['Product'] = sorted(set(products))
+
+        sub_products = [self._sub_products_by_key[k] for k in self._consume_matches(rest, self._sub_product_pattern, q)]
+        if sub_products:
+            filters['Sub-product'] = sub_products
+
+        # Also swallows suffixes the user typed out ("Capital One Financial Corp.")
+        companies = [name for key in self._consume_matches(rest, self._company_pattern, q) for name in self.companies[key]]
+        if companies:
+            filters['Company'] = companies
+
+        states = []
+        for m in STATE_CONTEXT_PATTERN.finditer(question):
+            group = 1 if m.group(1) else 2
+            for code in re.finditer(r"[A-Z]{2}", m.group(group)):
+                if code.group(0) in self.states and code.group(0) not in states:
+                    states.append(code.group(0))
+                    offset = m.start(group) + code.start()
+                    _consume(rest, (offset, offset + 2))
+        if states:
+            filters['State'] = states
+
+        start, end, period_span = self._parse_period(q)
+        if period_span:
+            _consume(rest, period_span)
+
+        issues = [self._issues_by_key[k] for k in self._consume_matches(rest, self._issue_pattern, q)]
+
+        topic = TOPIC_PATTERN.search(question)
+        if topic:
+            # Whatever of the 'about X' phrase a product/company/issue didn't already explain
+            phrase = " ".join(_content_words("".join(rest[topic.start(1):topic.end(1)])))
+            if phrase:
+                matched = [i for i in self.issues if re.search(rf"\b{re.escape(phrase)}\b", i.lower())]
+                if not matched:
+                    return None
+                issues += [i for i in matched if i not in issues]
+                _consume(rest, topic.span(1))
+        if issues:
+            filters['Issue'] = issues
+
+        if _content_words("".join(rest)):
+            return None
+
+        group_by = None
+        if intent == "breakdown":
+            noun = breakdown.group(1).lower()
+            group_by = next(col for prefix, col in BREAKDOWN_COLUMNS.items() if noun.startswith(prefix))
+
+        return {"intent": intent, "filters": filters, "start": start, "end": end, "group_by": group_by}
+
+    def _parse_period(self, q: str) -> Tuple[Optional[str], Optional[str], Optional[Tuple[int, int]]]:
+        """Resolves time expressions into inclusive 'YYYY-MM' bounds, plus the span of the matched phrase."""
+        ref = self.latest_month
+        if ref is None:
+            return None, None, None
+
+        m = re.search(r"\b(?:in |over |during )?(?:the )?last (\d+) months?\b", q)
+        if m:
+            return str(ref - (int(m.group(1)) - 1)), str(ref), m.span()
+        q_start = pd.Period(year=ref.year, month=3 * ((ref.month - 1) // 3) + 1, freq='M')
+        relative = {
+            "last quarter": (str(q_start - 3), str(q_start - 1)),
+            "this quarter": (str(q_start), str(ref)),
+            "last month": (str(ref - 1), str(ref - 1)),
+            "this month": (str(ref), str(ref)),
+            "last year": (f"{ref.year - 1}-01", f"{ref.year - 1}-12"),
+            "this year": (f"{ref.year}-01", str(ref)),
+        }
+        for phrase, (start, end) in relative.items():
+            m = re.search(rf"\b(?:in |during )?(?:the )?{phrase}\b", q)
+            if m:
+                return start, end, m.span()
+
+        month_names = "|".join(MONTHS)
+        m = re.search(rf"\bsince (?:({month_names}) )?(\d{{4}})\b", q)
+        if m:
+            month = MONTHS[m.group(1)] if m.group(1) else 1
+            return f"{m.group(2)}-{month:02d}", None, m.span()
+        m = re.search(rf"\b(?:in |during )?({month_names}) (\d{{4}})\b", q)
+        if m:
+            month = f"{m.group(2)}-{MONTHS[m.group(1)]:02d}"
+            return month, month, m.span()
+        m = re.search(r"\b(?:in|during) (\d{4})\b", q)
+        if m:
+            return f"{m.group(1)}-01", f"{m.group(1)}-12", m.span()
+        return None, None, None
+
+    # ------------------------------------------------------------------
+    # Aggregation
+    # ------------------------------------------------------------------
+    def _select(self, filters: Dict[str, List[str]], start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+        mask = pd.Series(True, index=self.df.index)
+        for col, values in filters.items():
+            mask &= self.df[col].isin(values)
+        month = self.df['month'].astype(str)
+        if start:
+            mask &= (month >= start) & (month != 'Unknown')
+        if end:
+            mask &= (month <= end) & (month != 'Unknown')
+        return self.df[mask]
+
+    def count(self, filters: Dict[str, List[str]], start: Optional[str] = None, end: Optional[str] = None) -> int:
+        return int(self._select(filters, start, end)['count'].sum())
+
+    def trend(self, filters: Dict[str, List[str]], start: Optional[str] = None, end: Optional[str] = None) -> pd.Series:
+        sel = self._select(filters, start, end)
+        sel = sel[sel['month'] != 'Unknown']
+        return sel.groupby(sel['month'].astype(str))['count'].sum().sort_index()
+
+    def breakdown(self, filters: Dict[str, List[str]], group_by: str,
+                  start: Optional[str] = None, end: Optional[str] = None, top_n: int = 10) -> pd.Series:
+        sel = self._select(filters, start, end)
+        return sel.groupby(group_by, observed=True)['count'].sum().sort_values(ascending=False).head(top_n)
+
+    # ------------------------------------------------------------------
+    # Answering
+    # ------------------------------------------------------------------
+    def answer(self, intent: Dict) -> str:
+        """Formats a Markdown answer for a parsed intent."""
+        filters, start, end = intent["filters"], intent["start"], intent["end"]
+        scope = self._describe(filters, start, end)
+
+        if intent["intent"] == "count":
+            return f"There were **{self.count(filters, start, end):,}** complaints {scope}."
+
+        if intent["intent"] == "trend":
+            series = self.trend(filters, start, end)
+            if start is None:
+                series = series.tail(12)
+            if series.empty:
+                return f"No complaints found {scope}."
+            lines = [f"Monthly complaint counts {scope}:", ""]
+            lines += [f"- {month}: {count:,}" for month, count in series.items()]
+            if len(series) > 1 and series.iloc[0]:
+                change = (series.iloc[-1] - series.iloc[0]) / series.iloc[0]
+                lines += ["", f"Change from {series.index[0]} to {series.index[-1]}: {change:+.1%}"]
+            return "\n".join(lines)
+
+        series = self.breakdown(filters, intent["group_by"], start, end)
+        if series.empty:
+            return f"No complaints found {scope}."
+        lines = [f"Top {intent['group_by'].lower()} values by complaint count {scope}:", ""]
+        lines += [f"{i}. {name}: {count:,}" for i, (name, count) in enumerate(series.items(), start=1)]
+        return "\n".join(lines)
+
+    @staticmethod
+    def _describe(filters: Dict[str, List[str]], start: Optional[str], end: Optional[str]) -> str:
+        parts = []
+        for col, values in filters.items():
+            shown = ", ".join(values[:3]) + (f" (+{len(values) - 3} more)" if len(values) > 3 else "")
+            parts.append(f"{col}: {shown}")
+        scope = f"matching {'; '.join(parts)}" if parts else "across all products"
+        if start and end:
+            scope += f" from {start} to {end}" if start != end else f" in {start}"
+        elif start:
+            scope += f" since {start}"
+        elif end:
+            scope += f" up to {end}"
+        return scope
@@ -0,0 +1,123 @@
+# src/benchmarking.py
+import re
+import json
+import zlib
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+
+# Define constants for defaults
+# Metrics where a larger value is better; every other numeric metric is "lower is better"
+HIGHER_IS_BETTER_SUFFIXES = ("_per_sec", "_qps")
+# Allowed relative regression by metric suffix (first match wins). Tail latencies
+# of sub-millisecond calls are the noisiest; memory is the most repeatable.
+DEFAULT_TOLERANCES = {
+    "_p99_ms": 0.50,
+    "_ms": 0.30,
+    "_per_sec": 0.30,
+    "_qps": 0.30,
+    "_mb": 0.15,
+}
+DEFAULT_TOLERANCE = 0.30
+# Absolute changes below these floors are treated as noise, whatever the relative change
+NOISE_FLOORS = {"_p99_ms": 1.0, "_ms": 0.5, "_mb": 5.0}
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Offline stand-in for all-MiniLM-L6-v2: signed feature hashing of word
+    unigrams into a fixed-size, L2-normalized vector. Deterministic across
+    runs, so texts sharing words land close together.
+    """
+
+    def __init__(self, size: int = 384):
+        self.size = size
+
+    def _embed(self, text: str) -> List[float]:
+        vec = np.zeros(self.size, dtype=np.float32)
+        for token in re.findall(r"\w+", text.lower()):
+            h = zlib.crc32(token.encode("utf-8"))
+            vec[h % self.size] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return (vec / norm if norm else vec).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class StubLLM:
+    """Drop-in for GenerationClient that answers instantly, for offline runs."""
+
+    def generate(self, prompt: str) -> str:
+        return f"Stub answer based on {len(prompt)} prompt characters."
+
+
+def latency_summary(latencies_ms: List[float], prefix: str) -> Dict[str, float]:
+    """p50/p99 (ms) and sequential queries per second for one pass of latencies."""
+    arr = np.asarray(latencies_ms, dtype=np.float64)
+    return {
+        f"{prefix}_p50_ms": round(float(np.percentile(arr, 50)), 3),
+        f"{prefix}_p99_ms": round(float(np.percentile(arr, 99)), 3),
+        f"{prefix}_qps": round(1000 * len(arr) / float(arr.sum()), 2) if arr.sum() else None,
+    }
+
+
+def _by_suffix(name: str, table: Dict[str, float], default: float) -> float:
+    return next((value for suffix, value in table.items() if name.endswith(suffix)), default)
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: Optional[float] = None) -> List[str]:
+    """
+    Lists metrics that regressed by more than their tolerance versus the baseline.
+
+    Throughput metrics (`*_per_sec`, `*_qps`) regress when they drop; latency
+    and memory metrics regress when they grow. Each metric uses its entry in
+    DEFAULT_TOLERANCES unless `tolerance` overrides all of them, and changes
+    smaller than the NOISE_FLOORS absolute amount never count. Metrics missing
+    on either side are ignored.
+    """
+    regressions = []
+    for name, base in baseline.get("metrics", {}).items():
+        current = results.get("metrics", {}).get(name)
+        if not isinstance(base, (int, float)) or not isinstance(current, (int, float)) or base == 0:
+            continue
+        if abs(current - base) < _by_suffix(name, NOISE_FLOORS, 0.0):
+            continue
+        allowed = tolerance if tolerance is not None else _by_suffix(name, DEFAULT_TOLERANCES, DEFAULT_TOLERANCE)
+        change = (current - base) / base
+        higher_is_better = name.endswith(HIGHER_IS_BETTER_SUFFIXES)
+        if (higher_is_better and change < -allowed) or (not higher_is_better and change > allowed):
+            regressions.append(f"{name}: {base} -> {current} ({change:+.1%}, allowed {allowed:.0%})")
+    return regressions
+
+
+def median_summary(passes: List[Dict[str, float]]) -> Dict[str, float]:
+    """Per-metric median over several `latency_summary` passes."""
+    return {name: round(float(np.median([p[name] for p in passes])), 3) for name in passes[0]}
+
+
+def best_results(runs: List[Dict]) -> Dict:
+    """
+    Combines several benchmark runs, keeping each metric's best value (highest
+    throughput, lowest latency / memory). A transient slowdown of the machine
+    affects one run; a real regression shows up in all of them.
+    """
+    merged = {"config": {**runs[0].get("config", {}), "runs": len(runs)}, "metrics": {}}
+    for name in runs[0].get("metrics", {}):
+        values = [r["metrics"][name] for r in runs if isinstance(r.get("metrics", {}).get(name), (int, float))]
+        if values:
+            merged["metrics"][name] = max(values) if name.endswith(HIGHER_IS_BETTER_SUFFIXES) else min(values)
+    return merged
+
+
+def load_json(path) -> Dict:
+    return json.loads(Path(path).read_text())
+
+
+def save_json(path, data: Dict) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(data, indent=2))
@@ -0,0 +1,179 @@
+# src/checkpointing.py
+import os
+import json
+import time
+import shutil
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Dict
+from langchain_community.vectorstores import FAISS
+
+logger = logging.getLogger(__name__)
+
+# Define constants for defaults
+STATE_FILENAME = "state.json"
+PROGRESS_FILENAME = "progress.json"
+DEFAULT_KEEP_VERSIONS = 2
+
+
+def file_fingerprint(path) -> Dict:
+    """Identifies an input file by path, size and modification time."""
+    stat = Path(path).stat()
+    return {"path": str(Path(path).resolve()), "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def _write_json_atomic(path: Path, data: Dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def publish_dir(new_dir, target, keep_versions: int = DEFAULT_KEEP_VERSIONS) -> Path:
+    """
+    Atomically publishes a fully written directory at `target`.
+
+    The directory is moved to `<target>.versions/<timestamp>` and `target` is
+    switched to point at it with a single symlink rename, so readers see either
+    the old or the new store, never a missing or half-written one. The link is
+    relative, so the store keeps working when its parent directory is copied,
+    mounted elsewhere or shipped in a container. Older versions beyond
+    `keep_versions` are removed.
+
+    If `target` is still a plain directory (a store written before versioned
+    publishing), it is first moved into `<target>.versions/`. That one-time
+    migration is not atomic: `target` is briefly missing, so run the first
+    publish while the app is stopped.
+
+    Args:
+        new_dir: Completely written directory to publish.
+        target: Path readers open (e.g. vector_store/full_faiss_index).
+        keep_versions (int): Number of published versions to retain (current included).
+
+    Returns:
+        Path: The versioned directory now served at `target`.
+    """
+    new_dir, target = Path(new_dir), Path(target)
+    versions_dir = target.with_name(target.name + ".versions")
+    versions_dir.mkdir(parents=True, exist_ok=True)
+
+    release = versions_dir / time.strftime("%Y%m%d-%H%M%S")
+    suffix = 1
+    while release.exists():
+        release = versions_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{suffix}"
+        suffix += 1
+    os.replace(new_dir, release)
+
+    tmp_link = target.with_name(target.name + ".link.tmp")
+    if tmp_link.is_symlink() or tmp_link.exists():
+        tmp_link.unlink()
+    try:
+        os.symlink(os.path.relpath(release, target.parent), tmp_link, target_is_directory=True)
+    except OSError:
+        # Symlinks unavailable (e.g. Windows without privileges): replace in place (not atomic).
+        logger.warning("Symlinks not supported here; replacing the store in place (not atomic).")
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.copytree(release, target)
+        return target
+
+    if target.exists() and not target.is_symlink():
+        # One-time migration of a store that was written as a plain directory (not atomic, see above)
+        logger.warning(f"{target} is a plain directory; moving it under {versions_dir} (store briefly unavailable).")
+        os.replace(target, versions_dir / f"legacy-{release.name}")
+    os.replace(tmp_link, target)
+
+    current = release.resolve()
+    older = sorted((p for p in versions_dir.iterdir() if p.resolve() != current), key=lambda p: p.stat().st_mtime)
+    for old in older[:max(0, len(older) - (keep_versions - 1))]:
+        shutil.rmtree(old, ignore_errors=True)
+    return release
+
+
+class BuildCheckpoint:
+    """
+    On-disk progress of an index build, kept in `<output_dir>.partial/`.
+
+    Holds embedded batches (one .npy shard per batch), an optional partial FAISS
+    index together with the number of rows it contains, and a fingerprint of
+    the build inputs. A checkpoint whose fingerprint differs from the current run is
+    discarded, so a resumed build never mixes data from different inputs.
+    """
+
+    def __init__(self, output_dir, fingerprint: Dict):
+        self.output_dir = Path(output_dir)
+        self.staging_dir = self.output_dir.with_name(self.output_dir.name + ".partial")
+        self.state_path = self.staging_dir / STATE_FILENAME
+        fingerprint = json.loads(json.dumps(fingerprint))
+
+        state = None
+        if self.state_path.exists():
+            state = json.loads(self.state_path.read_text())
+
+        if state is not None and state.get("fingerprint") == fingerprint:
+            self.state = state
+            logger.info(f"Resuming from checkpoint in {self.staging_dir} ({self.completed:,} rows indexed).")
+        else:
+            if self.staging_dir.exists():
+                logger.warning(f"Discarding stale checkpoint in {self.staging_dir}")
+                shutil.rmtree(self.staging_dir)
+            self.staging_dir.mkdir(parents=True)
+            self.state = {"fingerprint": fingerprint}
+            _write_json_atomic(self.state_path, self.state)
+
+    @property
+    def completed(self) -> int:
+        """Number of rows contained in the checkpointed partial index."""
+        progress = self.staging_dir / "index" / PROGRESS_FILENAME
+        return json.loads(progress.read_text())["completed"] if progress.exists() else 0
+
+    # --- Embedded batches ---
+    def _shard_path(self, batch_idx: int) -> Path:
+        return self.staging_dir / "embeddings" / f"batch_{batch_idx:06d}.npy"
+
+    def has_embeddings(self, batch_idx: int) -> bool:
+        return self._shard_path(batch_idx).exists()
+
+    def save_embeddings(self, batch_idx: int, embeddings) -> None:
+        path = self._shard_path(batch_idx)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npy")
+        np.save(tmp, np.asarray(embeddings, dtype=np.float32))
+        os.replace(tmp, path)
+
+    def load_embeddings(self, batch_idx: int) -> np.ndarray:
+        return np.load(self._shard_path(batch_idx))
+
+    # --- Partial index ---
+    def save_index(self, vectorstore, completed: int) -> None:
+        """Persists the partial index along with the number of rows it holds."""
+        tmp_dir = self.staging_dir / "index.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        vectorstore.save_local(str(tmp_dir))
+        _write_json_atomic(tmp_dir / PROGRESS_FILENAME, {"completed": int(completed)})
+
+        # If interrupted between these two steps the partial index is simply rebuilt
+        index_dir = self.staging_dir / "index"
+        if index_dir.exists():
+            shutil.rmtree(index_dir)
+        os.replace(tmp_dir, index_dir)
+
+    def load_index(self, embedding_model):
+        """Loads the partial index, or returns None if there is none."""
+        index_dir = self.staging_dir / "index"
+        if self.completed == 0:
+            return None
+        return FAISS.load_local(str(index_dir), embedding_model, allow_dangerous_deserialization=True)
+
+    # --- Completion ---
+    @property
+    def final_dir(self) -> Path:
+        """Directory to write the finished store into before it is published."""
+        return self.staging_dir / "final"
+
+    def publish(self, keep_versions: int = DEFAULT_KEEP_VERSIONS) -> Path:
+        """Swaps the finished store in at `output_dir` and removes the checkpoint."""
+        release = publish_dir(self.final_dir, self.output_dir, keep_versions)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        return release
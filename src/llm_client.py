@@ -0,0 +1,215 @@
+# src/llm_client.py
+import time
+import threading
+import numpy as np
+import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Tuple
+
+# Define constants for defaults
+# OpenAI-compatible chat-completions route of the Hugging Face inference router
+# (provider picked by the router). TGI and vLLM serve the same route at /v1/chat/completions.
+DEFAULT_ENDPOINT_URL = "https://router.huggingface.co/v1/chat/completions"
+DEFAULT_DEADLINE = 30.0          # seconds a user waits before the fallback answer
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_HEDGE_PERCENTILE = 95
+DEFAULT_HEDGE_INITIAL_DELAY = 5.0  # hedge delay until enough latencies are observed
+DEFAULT_HEDGE_MIN_DELAY = 0.25
+DEFAULT_POOL_SIZE = 10
+MIN_LATENCY_SAMPLES = 20
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised immediately while the circuit breaker is open."""
+
+
+class GenerationError(RuntimeError):
+    """Raised when no endpoint produced an answer before the deadline."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and calls
+    fail fast for `reset_timeout` seconds; then a single trial call is let
+    through, which closes the breaker on success or re-opens it on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+                return True
+            return self.state == "closed"
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class GenerationClient:
+    """
+    Client for OpenAI-compatible chat-completions endpoints (HF router, TGI, vLLM).
+
+    The prompt is sent as a single user message, so the server applies the
+    model's own chat template (BOS and instruction tokens included).
+
+    - One pooled keep-alive `requests.Session` shared by all calls.
+    - Every call has a deadline; connect/read timeouts shrink to what is left of it.
+    - If the primary endpoint has not answered after the observed latency
+      percentile (or fails early), the request is hedged to the next endpoint
+      and the first successful answer wins.
+    - A circuit breaker makes calls fail fast while the endpoints are down.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        model: Optional[str] = None,
+        token: Optional[str] = None,
+        max_new_tokens: int = 512,
+        temperature: float = 0.1,
+        deadline: float = DEFAULT_DEADLINE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        hedge_initial_delay: float = DEFAULT_HEDGE_INITIAL_DELAY,
+        hedge_min_delay: float = DEFAULT_HEDGE_MIN_DELAY,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        breaker: Optional[CircuitBreaker] = None,
+        latency_window: int = 200,
+    ):
+        if not endpoints:
+            raise ValueError("At least one endpoint is required.")
+        self.endpoints = list(endpoints)
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.parameters = {"max_tokens": max_new_tokens, "temperature": temperature, "stream": False}
+        if model:
+            self.parameters["model"] = model
+
+        self.session = requests.Session()
+        # Losing hedged requests keep running in the background, so size the pool for them too
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=pool_size * len(self.endpoints), max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+        # Each call may run one request per endpoint concurrently
+        self._executor = ThreadPoolExecutor(max_workers=pool_size * len(self.endpoints))
+        self._latencies = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on an endpoint before hedging to the next one."""
+        with self._lock:
+            samples = list(self._latencies)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return self.hedge_initial_delay
+        return max(self.hedge_min_delay, float(np.percentile(samples, self.hedge_percentile)))
+
+    def _record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _post(self, url: str, prompt: str, deadline_at: float) -> Tuple[str, Optional[Dict]]:
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Deadline exceeded before the request was sent.")
+        response = self.session.post(
+            url,
+            json={**self.parameters, "messages": [{"role": "user", "content": prompt}]},
+            timeout=(min(self.connect_timeout, remaining), remaining),
+        )
+        response.raise_for_status()
+        payload = response.json()
+        return payload["choices"][0]["message"]["content"], payload.get("usage")
+
+    def generate(self, prompt: str) -> str:
+        """Returns the generated text. See `generate_with_usage`."""
+        return self.generate_with_usage(prompt)[0]
+
+    def generate_with_usage(self, prompt: str) -> Tuple[str, Optional[Dict]]:
+        """
+        Returns the generated text and the endpoint's token `usage` block
+        ({'prompt_tokens', 'completion_tokens', ...}), or None if it sent none.
+
+        Raises:
+            CircuitOpenError: The breaker is open; no request was sent.
+            GenerationError: All attempts failed or the deadline passed.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open.")
+
+        start = time.monotonic()
+        deadline_at = start + self.deadline
+        hedge_delay = self.hedge_delay()
+        next_endpoint = 1
+        primary = self._executor.submit(self._post, self.endpoints[0], prompt, deadline_at)
+        # Record primary latency even when a hedge wins, so the percentile is not biased low
+        primary.add_done_callback(lambda f: f.exception() is None and self._record_latency(time.monotonic() - start))
+        in_flight = {primary}
+        errors = []
+
+        while in_flight:
+            now = time.monotonic()
+            wait_for = deadline_at - now
+            if next_endpoint < len(self.endpoints):
+                wait_for = min(wait_for, max(0.0, start + hedge_delay * next_endpoint - now))
+            done, in_flight = wait(in_flight, timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                self.breaker.record_success()
+                return result
+
+            if time.monotonic() >= deadline_at:
+                break
+            # Hedge on slowness, retry immediately on an early failure
+            hedge_due = time.monotonic() - start >= hedge_delay * next_endpoint
+            if next_endpoint < len(self.endpoints) and (hedge_due or not in_flight):
+                in_flight.add(self._executor.submit(self._post, self.endpoints[next_endpoint], prompt, deadline_at))
+                next_endpoint += 1
+
+        self.breaker.record_failure()
+        reason = repr(errors[-1]) if errors else f"deadline of {self.deadline:.1f}s exceeded"
+        raise GenerationError(f"Generation failed: {reason}")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,145 @@
+# src/sampling.py
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Define constants for defaults
+DEFAULT_BATCH_SIZE = 65_536
+DEFAULT_STRATA_COLUMN = 'Product'
+DEFAULT_DATE_COLUMN = 'Date received'
+SAMPLE_COLUMNS = ['Complaint ID', 'Product', 'Issue', 'Company', 'Date received', 'cleaned_narrative']
+_ROW_COLUMN = '__row'
+
+
+def build_filter(
+    products: Optional[List[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    date_column: str = DEFAULT_DATE_COLUMN,
+) -> Optional[ds.Expression]:
+    """
+    Builds a pyarrow filter expression that the Parquet reader can push down.
+
+    Args:
+        products (Optional[List[str]]): Exact 'Product' values to keep.
+        date_from (Optional[str]): Inclusive lower bound, ISO 'YYYY-MM-DD'.
+        date_to (Optional[str]): Inclusive upper bound, ISO 'YYYY-MM-DD'.
+        date_column (str): Column holding the ISO date strings.
+
+    Returns:
+        Optional[ds.Expression]: Combined expression, or None if no filter was given.
+    """
+    expr = None
+    if products:
+        expr = ds.field(DEFAULT_STRATA_COLUMN).isin(products)
+    if date_from:
+        cond = ds.field(date_column) >= date_from
+        expr = cond if expr is None else expr & cond
+    if date_to:
+        cond = ds.field(date_column) <= date_to
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def count_strata(
+    path: Path,
+    strata_column: str = DEFAULT_STRATA_COLUMN,
+    filters: Optional[ds.Expression] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, int]:
+    """Counts rows per stratum, reading only the strata column."""
+    dataset = ds.dataset(str(path), format='parquet')
+    counts: Counter = Counter()
+    for batch in dataset.to_batches(columns=[strata_column], filter=filters, batch_size=batch_size):
+        for item in pc.value_counts(batch.column(0)).to_pylist():
+            if item['values'] is not None:
+                counts[item['values']] += item['counts']
+    return dict(counts)
+
+
+def stream_stratified_sample(
+    path: Path,
+    target_size: int,
+    strata_column: str = DEFAULT_STRATA_COLUMN,
+    columns: Optional[List[str]] = None,
+    filters: Optional[ds.Expression] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Stratified sample of a Parquet file without loading it into memory.
+
+    Pass 1 reads only the strata column to size each stratum's quota
+    (proportional allocation, like `groupby().sample(frac=...)`). Pass 2 scans
+    record batches and keeps, per stratum, the rows with the smallest random
+    keys (reservoir sampling with random priorities). Memory is
+    O(target_size + batch_size).
+
+    Args:
+        path (Path): Parquet file (or directory of Parquet files).
+        target_size (int): Approximate total number of rows to keep.
+        strata_column (str): Column to stratify on.
+        columns (Optional[List[str]]): Columns to read. None reads all columns.
+        filters (Optional[ds.Expression]): Filter pushed down to the Parquet reader.
+        batch_size (int): Rows per record batch.
+        seed (int): Random seed; the same seed and file give the same sample.
+
+    Returns:
+        pd.DataFrame: Sampled rows, grouped by stratum, in file order within each stratum.
+    """
+    counts = count_strata(path, strata_column, filters, batch_size)
+    total = sum(counts.values())
+    if total <= target_size:
+        quotas = counts
+    else:
+        frac = target_size / total
+        quotas = {s: int(round(n * frac)) for s, n in counts.items()}
+
+    if columns is not None and strata_column not in columns:
+        columns = columns + [strata_column]
+
+    dataset = ds.dataset(str(path), format='parquet')
+    rng = np.random.default_rng(seed)
+    reservoirs: Dict[str, pa.Table] = {}
+    reservoir_keys: Dict[str, np.ndarray] = {}
+    offset = 0
+
+    for batch in dataset.to_batches(columns=columns, filter=filters, batch_size=batch_size):
+        n = batch.num_rows
+        if n == 0:
+            continue
+        keys = rng.random(n)
+        table = pa.Table.from_batches([batch]).append_column(_ROW_COLUMN, pa.array(np.arange(offset, offset + n)))
+        strata = table.column(strata_column).to_numpy(zero_copy_only=False)
+        offset += n
+
+        for stratum in set(strata) - {None}:
+            k = quotas.get(stratum, 0)
+            if k == 0:
+                continue
+            mask = strata == stratum
+            cand_table = table.filter(pa.array(mask))
+            cand_keys = keys[mask]
+            if stratum in reservoirs:
+                cand_table = pa.concat_tables([reservoirs[stratum], cand_table])
+                cand_keys = np.concatenate([reservoir_keys[stratum], cand_keys])
+            if len(cand_keys) > k:
+                keep = np.argpartition(cand_keys, k - 1)[:k]
+                cand_table = cand_table.take(pa.array(keep))
+                cand_keys = cand_keys[keep]
+            reservoirs[stratum] = cand_table
+            reservoir_keys[stratum] = cand_keys
+
+    if not reservoirs:
+        schema_names = columns if columns is not None else dataset.schema.names
+        return pd.DataFrame(columns=schema_names)
+
+    sample = pa.concat_tables(
+        reservoirs[s].sort_by(_ROW_COLUMN) for s in sorted(reservoirs)
+    ).drop_columns([_ROW_COLUMN])
+    return sample.to_pandas()
@@ -0,0 +1,118 @@
+# src/synthetic_data.py
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Define constants for defaults
+CFPB_COLUMNS = [
+    'Date received', 'Product', 'Sub-product', 'Issue', 'Sub-issue',
+    'Consumer complaint narrative', 'Company public response', 'Company', 'State',
+    'ZIP code', 'Tags', 'Consumer consent provided?', 'Submitted via',
+    'Date sent to company', 'Company response to consumer', 'Timely response?',
+    'Consumer disputed?', 'Complaint ID'
+]
+
+# (Product, Sub-products, Issues) - the first five match DEFAULT_TARGET_PATTERN, the rest are filtered out
+PRODUCTS = [
+    ("Credit card", ["General-purpose credit card or charge card", "Store credit card"],
+     ["Fees or interest", "Problem with a purchase shown on your statement", "Getting a credit card"]),
+    ("Prepaid card", ["General-purpose prepaid card", "Gift card"],
+     ["Trouble using the card", "Unauthorized transactions or other transaction problem"]),
+    ("Payday loan, title loan, or personal loan", ["Installment loan", "Personal line of credit"],
+     ["Charged fees or interest you didn't expect", "Struggling to pay your loan"]),
+    ("Checking or savings account", ["Savings account", "Checking account"],
+     ["Managing an account", "Opening an account", "Closing an account"]),
+    ("Money transfer, virtual currency, or money service", ["Domestic (US) money transfer", "International money transfer"],
+     ["Fraud or scam", "Other transaction problem", "Money was not available when promised"]),
+    ("Mortgage", ["Conventional home mortgage", "FHA mortgage"],
+     ["Trouble during payment process", "Applying for a mortgage"]),
+    ("Debt collection", ["Credit card debt", "Medical debt"],
+     ["Attempts to collect debt not owed", "Written notification about debt"]),
+]
+COMPANIES = [
+    "CAPITAL ONE FINANCIAL CORPORATION", "JPMORGAN CHASE & CO.", "BANK OF AMERICA, NATIONAL ASSOCIATION",
+    "WELLS FARGO & COMPANY", "CITIBANK, N.A.", "PAYPAL HOLDINGS, INC.", "SYNCHRONY FINANCIAL",
+    "DISCOVER BANK", "U.S. BANCORP", "BLOCK, INC.",
+]
+STATES = ["CA", "TX", "FL", "NY", "GA", "IL", "PA", "NC", "OH", "NJ", "MI", "VA", "WA", "AZ", "MA"]
+OPENINGS = [
+    "I am writing to file a complaint", "To whom it may concern,", "This is a complaint regarding my account.", "",
+]
+SENTENCES = [
+    "On XX/XX/XXXX I noticed a charge of {amount} that I did not authorize.",
+    "I called customer service several times and was told the issue would be resolved.",
+    "The company charged me a late fee even though my payment was sent on time.",
+    "My transfer of {amount} to a family member never arrived and the money is gone.",
+    "They closed my account without notice and are holding my balance of {amount}.",
+    "I disputed the transaction but the bank denied my claim without investigating.",
+    "The interest rate on my card was increased without any explanation.",
+    "A representative named XXXX promised a refund that I never received.",
+    "I have been waiting more than 30 days for my funds to be released.",
+    "The app showed the payment as completed but the recipient did not get it.",
+    "I was a victim of fraud and the company refuses to reimburse me.",
+    "They keep reporting incorrect information to the credit bureaus.",
+]
+
+
+def generate_complaints(n_rows: int, seed: int = 42, narrative_rate: float = 0.6, target_rate: float = 0.7) -> pd.DataFrame:
+    """
+    Generates a synthetic CFPB complaints table with the raw export's columns.
+
+    Args:
+        n_rows (int): Number of complaints to generate.
+        seed (int): Random seed; the same seed gives the same data.
+        narrative_rate (float): Share of rows with a consumer narrative (the rest are empty).
+        target_rate (float): Share of rows in one of the five target product lines.
+
+    Returns:
+        pd.DataFrame: Complaints with all CFPB columns, as strings.
+    """
+    rng = np.random.default_rng(seed)
+    n_target = 5
+
+    is_target = rng.random(n_rows) < target_rate
+    product_idx = np.where(is_target, rng.integers(0, n_target, n_rows), rng.integers(n_target, len(PRODUCTS), n_rows))
+    dates = pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 6 * 365, n_rows), unit="D")
+    has_narrative = rng.random(n_rows) < narrative_rate
+    n_sentences = rng.integers(2, 12, n_rows)
+
+    rows = {col: [] for col in CFPB_COLUMNS}
+    for i in range(n_rows):
+        product, sub_products, issues = PRODUCTS[product_idx[i]]
+        if has_narrative[i]:
+            picks = rng.integers(0, len(SENTENCES), n_sentences[i])
+            body = " ".join(SENTENCES[j].format(amount=f"${rng.integers(20, 5000)}.00") for j in picks)
+            narrative = f"{OPENINGS[rng.integers(0, len(OPENINGS))]} {body}".strip()
+        else:
+            narrative = ""
+
+        rows['Date received'].append(dates[i].strftime("%Y-%m-%d"))
+        rows['Product'].append(product)
+        rows['Sub-product'].append(sub_products[rng.integers(0, len(sub_products))])
+        rows['Issue'].append(issues[rng.integers(0, len(issues))])
+        rows['Sub-issue'].append("")
+        rows['Consumer complaint narrative'].append(narrative)
+        rows['Company public response'].append("Company has responded to the consumer and the CFPB and chooses not to provide a public response")
+        rows['Company'].append(COMPANIES[rng.integers(0, len(COMPANIES))])
+        rows['State'].append(STATES[rng.integers(0, len(STATES))])
+        rows['ZIP code'].append(f"{rng.integers(10000, 99999)}")
+        rows['Tags'].append("")
+        rows['Consumer consent provided?'].append("Consent provided" if narrative else "Consent not provided")
+        rows['Submitted via'].append("Web")
+        rows['Date sent to company'].append(dates[i].strftime("%Y-%m-%d"))
+        rows['Company response to consumer'].append("Closed with explanation")
+        rows['Timely response?'].append("Yes")
+        rows['Consumer disputed?'].append("N/A")
+        rows['Complaint ID'].append(str(1_000_000 + i))
+
+    df = pd.DataFrame(rows, columns=CFPB_COLUMNS)
+    df['Consumer complaint narrative'] = df['Consumer complaint narrative'].replace("", np.nan)
+    return df
+
+
+def write_complaints_csv(path: Path, n_rows: int, seed: int = 42) -> Path:
+    """Writes a synthetic CFPB-shaped CSV (see `generate_complaints`) and returns its path."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    generate_complaints(n_rows, seed).to_csv(path, index=False)
+    return path
@@ -0,0 +1,235 @@
+# src/vector_compression.py
+import json
+import time
+import numpy as np
+import faiss
+from pathlib import Path
+from typing import Dict, Optional
+
+# Define constants for defaults
+VECTOR_DTYPES = {
+    "float32": "Flat",   # Full precision (4 bytes / dim)
+    "float16": "SQfp16", # Half precision (2 bytes / dim)
+    "int8": "SQ8",       # 8-bit scalar quantization (1 byte / dim)
+}
+DEFAULT_VECTOR_DTYPE = "float32"
+DEFAULT_TRAIN_SIZE = 100_000
+DEFAULT_BATCH_SIZE = 50_000
+CONFIG_FILENAME = "compression.json"
+REPORT_FILENAME = "compression_report.json"
+
+
+def index_factory_string(vector_dtype: str = DEFAULT_VECTOR_DTYPE, pca_dim: Optional[int] = None) -> str:
+    """
+    Builds the FAISS index_factory description for a storage configuration.
+
+    Args:
+        vector_dtype (str): One of 'float32', 'float16' or 'int8'.
+        pca_dim (Optional[int]): Target dimension after PCA. None/0 disables PCA.
+
+    Returns:
+        str: Factory string, e.g. 'PCA128,SQ8'.
+    """
+    if vector_dtype not in VECTOR_DTYPES:
+        raise ValueError(f"Unknown vector dtype '{vector_dtype}'. Expected one of {list(VECTOR_DTYPES)}.")
+
+    parts = []
+    if pca_dim:
+        parts.append(f"PCA{int(pca_dim)}")
+    parts.append(VECTOR_DTYPES[vector_dtype])
+    return ",".join(parts)
+
+
+def is_compressed(vector_dtype: str = DEFAULT_VECTOR_DTYPE, pca_dim: Optional[int] = None) -> bool:
+    """Returns True if the configuration differs from the plain float32 flat index."""
+    return vector_dtype != DEFAULT_VECTOR_DTYPE or bool(pca_dim)
+
+
+def compress_index(
+    flat_index: faiss.Index,
+    vector_dtype: str = DEFAULT_VECTOR_DTYPE,
+    pca_dim: Optional[int] = None,
+    train_size: int = DEFAULT_TRAIN_SIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    seed: int = 42,
+) -> faiss.Index:
+    """
+    Re-encodes a full-precision flat index into reduced precision and/or dimension.
+
+    The PCA matrix is stored inside the returned index (IndexPreTransform), so
+    any query searched against it goes through exactly the same projection.
+    Vectors are added in their original order, which keeps the LangChain
+    `index_to_docstore_id` mapping valid.
+
+    Args:
+        flat_index (faiss.Index): Source index that supports `reconstruct_n`.
+        vector_dtype (str): One of 'float32', 'float16' or 'int8'.
+        pca_dim (Optional[int]): Target dimension after PCA. None/0 disables PCA.
+        train_size (int): Number of vectors sampled to train PCA / quantizer ranges.
+        batch_size (int): Number of vectors re-encoded per batch.
+        seed (int): Random seed for the training sample.
+
+    Returns:
+        faiss.Index: The trained and populated compressed index.
+    """
+    d = flat_index.d
+    ntotal = flat_index.ntotal
+    if pca_dim and not 0 < pca_dim < d:
+        raise ValueError(f"pca_dim must be between 1 and {d - 1}, got {pca_dim}.")
+    if pca_dim and pca_dim > min(train_size, ntotal):
+        # PCA cannot output more components than it has training vectors
+        raise ValueError(
+            f"pca_dim={pca_dim} needs at least {pca_dim} training vectors, but only "
+            f"{min(train_size, ntotal)} are available ({ntotal} in the store, train_size={train_size}). "
+            f"Use a smaller pca_dim or a larger sample."
+        )
+
+    index = faiss.index_factory(d, index_factory_string(vector_dtype, pca_dim), flat_index.metric_type)
+
+    if not index.is_trained:
+        rng = np.random.default_rng(seed)
+        n_train = min(train_size, ntotal)
+        train_ids = np.sort(rng.choice(ntotal, size=n_train, replace=False))
+        train_x = np.vstack([flat_index.reconstruct(int(i)) for i in train_ids]).astype(np.float32)
+        index.train(train_x)
+
+    for start in range(0, ntotal, batch_size):
+        n = min(batch_size, ntotal - start)
+        index.add(flat_index.reconstruct_n(start, n))
+
+    return index
+
+
+def index_memory_bytes(index: faiss.Index) -> int:
+    """Approximate in-memory size of an index's vector storage, in bytes."""
+    try:
+        return int(index.sa_code_size()) * int(index.ntotal)
+    except RuntimeError:
+        # Index types without a standalone code size: fall back to serialized size
+        return int(faiss.serialize_index(index).nbytes)
+
+
+def _timed_search(index: faiss.Index, queries: np.ndarray, k: int):
+    """Runs one query at a time (as CreditRAG does) and returns ids and per-query latency in ms."""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = np.empty(len(queries), dtype=np.float64)
+    for i, q in enumerate(queries):
+        t0 = time.perf_counter()
+        _, ids[i] = index.search(q.reshape(1, -1), k)
+        latencies[i] = (time.perf_counter() - t0) * 1000
+    return ids, latencies
+
+
+def _drop_self(ids: np.ndarray, query_ids: Optional[np.ndarray], k: int) -> np.ndarray:
+    """Removes each query's own id from its result row (leave-one-out) and keeps the first k."""
+    if query_ids is None:
+        return ids[:, :k]
+    return np.vstack([row[row != qid][:k] for row, qid in zip(ids, query_ids)])
+
+
+def compression_report(
+    reference_index: faiss.Index,
+    candidate_index: faiss.Index,
+    n_queries: int = 1000,
+    k: int = 5,
+    seed: int = 42,
+    queries: Optional[np.ndarray] = None,
+) -> Dict:
+    """
+    Compares a compressed index against the full-precision reference.
+
+    Recall@k is the share of the reference top-k ids that the candidate also
+    returns. With real query embeddings (`queries`) they are used as-is.
+    Otherwise queries are sampled from the stored vectors and held out: each
+    query's own id is dropped from both result lists, so a vector trivially
+    finding itself does not inflate recall.
+
+    Args:
+        reference_index (faiss.Index): Full-precision flat index.
+        candidate_index (faiss.Index): Compressed index holding the same vectors.
+        n_queries (int): Number of query vectors to sample when `queries` is None.
+        k (int): Number of neighbours to compare.
+        seed (int): Random seed for the query sample.
+        queries (Optional[np.ndarray]): Real query embeddings, shape (n, d).
+
+    Returns:
+        Dict: Memory footprint, p50/p99 search latency and recall@k for both indexes.
+    """
+    if queries is not None:
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        query_ids = None
+        n_search = k
+    else:
+        rng = np.random.default_rng(seed)
+        n_queries = min(n_queries, reference_index.ntotal)
+        query_ids = rng.choice(reference_index.ntotal, size=n_queries, replace=False)
+        queries = np.vstack([reference_index.reconstruct(int(i)) for i in query_ids]).astype(np.float32)
+        n_search = k + 1
+    n_queries = len(queries)
+
+    ref_ids, ref_lat = _timed_search(reference_index, queries, n_search)
+    cand_ids, cand_lat = _timed_search(candidate_index, queries, n_search)
+    ref_ids = _drop_self(ref_ids, query_ids, k)
+    cand_ids = _drop_self(cand_ids, query_ids, k)
+
+    hits = sum(len(set(r) & set(c)) for r, c in zip(ref_ids.tolist(), cand_ids.tolist()))
+    ref_bytes = index_memory_bytes(reference_index)
+    cand_bytes = index_memory_bytes(candidate_index)
+
+    return {
+        "n_vectors": int(reference_index.ntotal),
+        "n_queries": int(n_queries),
+        "k": k,
+        "held_out": query_ids is not None,
+        "reference": {
+            "memory_mb": round(ref_bytes / 1024 ** 2, 2),
+            "latency_p50_ms": round(float(np.percentile(ref_lat, 50)), 3),
+            "latency_p99_ms": round(float(np.percentile(ref_lat, 99)), 3),
+        },
+        "candidate": {
+            "memory_mb": round(cand_bytes / 1024 ** 2, 2),
+            "latency_p50_ms": round(float(np.percentile(cand_lat, 50)), 3),
+            "latency_p99_ms": round(float(np.percentile(cand_lat, 99)), 3),
+        },
+        "memory_ratio": round(cand_bytes / ref_bytes, 4) if ref_bytes else None,
+        f"recall@{k}": round(hits / (n_queries * k), 4) if n_queries else None,
+    }
+
+
+def save_compression_config(output_dir, vector_dtype: str, pca_dim: Optional[int], report: Optional[Dict] = None) -> None:
+    """Writes the storage configuration (and optional report) next to a saved FAISS index."""
+    output_dir = Path(output_dir)
+    config = {
+        "vector_dtype": vector_dtype,
+        "pca_dim": int(pca_dim) if pca_dim else None,
+        "factory": index_factory_string(vector_dtype, pca_dim),
+    }
+    (output_dir / CONFIG_FILENAME).write_text(json.dumps(config, indent=2))
+    if report is not None:
+        (output_dir / REPORT_FILENAME).write_text(json.dumps(report, indent=2))
+
+
+def load_compression_config(index_dir) -> Dict:
+    """Reads the storage configuration of a saved FAISS index. Missing file means full precision."""
+    path = Path(index_dir) / CONFIG_FILENAME
+    if not path.exists():
+        return {"vector_dtype": DEFAULT_VECTOR_DTYPE, "pca_dim": None, "factory": index_factory_string()}
+    return json.loads(path.read_text())
+
+
+def compress_vectorstore(vectorstore, vector_dtype: str, pca_dim: Optional[int] = None, report: bool = False) -> Optional[Dict]:
+    """
+    Swaps the flat index of a LangChain FAISS vector store for a compressed one, in place.
+
+    Args:
+        vectorstore: LangChain FAISS vector store built with full-precision vectors.
+        vector_dtype (str): One of 'float32', 'float16' or 'int8'.
+        pca_dim (Optional[int]): Target dimension after PCA. None/0 disables PCA.
+        report (bool): If True, also compares the result against the flat index.
+
+    Returns:
+        Optional[Dict]: The compression report, or None if not requested.
+    """
+    flat_index = vectorstore.index
+    vectorstore.index = compress_index(flat_index, vector_dtype, pca_dim)
+    return compression_report(flat_index, vectorstore.index) if report else None
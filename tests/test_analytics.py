@@ -0,0 +1,98 @@
+import time
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from src.analytics import build_aggregates, ComplaintAggregates
+
+
+@pytest.fixture
+def aggregates():
+    rows = [
+        # Product, Sub-product, Issue, Company, State, Date received
+        ("Money transfer, virtual currency, or money service", "Domestic (US) money transfer", "Fraud or scam", "WELLS FARGO & COMPANY", "CA", "2023-04-10"),
+        ("Money transfer, virtual currency, or money service", "Domestic (US) money transfer", "Fraud or scam", "WELLS FARGO & COMPANY", "TX", "2023-05-02"),
+        ("Money transfer, virtual currency, or money service", "International money transfer", "Other transaction problem", "PAYPAL HOLDINGS, INC.", "CA", "2023-06-20"),
+        ("Credit card", "General-purpose credit card or charge card", "Fees or interest", "CAPITAL ONE FINANCIAL CORPORATION", "NY", "2023-05-15"),
+        ("Credit card", "General-purpose credit card or charge card", "Fraud or scam", "CAPITAL ONE FINANCIAL CORPORATION", "NY", "2023-08-01"),
+        ("Credit card", "General-purpose credit card or charge card", "Fees or interest", "CAPITAL ONE FINANCIAL CORPORATION", "CA", "2023-08-20"),
+    ]
+    df = pd.DataFrame(rows, columns=["Product", "Sub-product", "Issue", "Company", "State", "Date received"])
+    return ComplaintAggregates(build_aggregates(df))
+
+
+def test_open_ended_questions_are_not_routed(aggregates):
+    assert aggregates.parse("Why are customers upset about Money Transfers?") is None
+
+
+def test_count_with_product_issue_and_relative_quarter(aggregates):
+    intent = aggregates.parse("How many Money Transfer complaints were about fraud last quarter?")
+    assert intent["intent"] == "count"
+    # Latest month in data is 2023-08, so last quarter is Q2 2023
+    assert (intent["start"], intent["end"]) == ("2023-04", "2023-06")
+    assert aggregates.count(intent["filters"], intent["start"], intent["end"]) == 2
+
+
+def test_unknown_topic_falls_back_to_rag(aggregates):
+    assert aggregates.parse("How many complaints were about dragons?") is None
+
+
+@pytest.mark.parametrize("question", [
+    "How many complaints mention late fees?",
+    "How many BNPL complaints?",
+    "Which company is the worst at handling fraud disputes?",
+    "What are the most common issues with credit card late fees?",
+    "How many complaints about Wells Fargo were resolved last week?",
+])
+def test_unmapped_words_fall_back_to_rag(aggregates, question):
+    assert aggregates.parse(question) is None
+
+
+def test_about_phrase_matching_a_company_or_product_skips_issue_lookup(aggregates):
+    intent = aggregates.parse("How many complaints about Wells Fargo?")
+    assert intent["filters"] == {"Company": ["WELLS FARGO & COMPANY"]}
+    assert aggregates.count(intent["filters"]) == 2
+
+    intent = aggregates.parse("How many complaints were about credit cards in NY?")
+    assert "Issue" not in intent["filters"]
+    assert aggregates.count(intent["filters"]) == 2
+
+
+def test_about_phrase_leftover_maps_to_issue(aggregates):
+    intent = aggregates.parse("How many complaints about credit card fees?")
+    assert intent["filters"] == {"Product": ["Credit card"], "Issue": ["Fees or interest"]}
+    assert aggregates.count(intent["filters"]) == 2
+
+
+def test_state_codes_need_state_context(aggregates):
+    intent = aggregates.parse("How many complaints about credit cards OR prepaid cards?")
+    assert "State" not in intent["filters"]
+
+    intent = aggregates.parse("How many credit card complaints in NY or CA?")
+    assert intent["filters"]["State"] == ["NY", "CA"]
+    assert aggregates.parse("How many CA complaints last quarter?")["filters"] == {"State": ["CA"]}
+    assert aggregates.parse("How many complaints are OK?") is None
+
+
+def test_parse_is_fast_with_thousands_of_companies():
+    rows = [("Credit card", "Store credit card", f"Issue {i % 150}", f"ACME LENDING {i} LLC", "CA", "2023-05-01")
+            for i in range(6000)]
+    df = pd.DataFrame(rows, columns=["Product", "Sub-product", "Issue", "Company", "State", "Date received"])
+    aggregates = ComplaintAggregates(build_aggregates(df))
+
+    aggregates.parse("How many credit card complaints in CA last quarter?")  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(10):
+        intent = aggregates.parse("How many credit card complaints in CA last quarter?")
+    assert (time.perf_counter() - t0) / 10 < 0.05
+    assert intent["filters"] == {"Product": ["Credit card"], "State": ["CA"]}
+    assert aggregates.parse("How many complaints about Acme Lending 4321?")["filters"] == {"Company": ["ACME LENDING 4321 LLC"]}
+
+
+def test_trend_and_breakdown(aggregates):
+    trend = aggregates.parse("Show the monthly trend of credit card complaints")
+    assert aggregates.trend(trend["filters"]).to_dict() == {"2023-05": 1, "2023-08": 2}
+
+    top = aggregates.parse("Which companies have the most complaints in 2023?")
+    assert top["group_by"] == "Company"
+    assert "CAPITAL ONE FINANCIAL CORPORATION" in aggregates.answer(top)
@@ -0,0 +1,51 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from src.synthetic_data import CFPB_COLUMNS, write_complaints_csv
+from src.data_loading import load_and_filter_complaints
+from src.benchmarking import compare_to_baseline, best_results
+
+
+def test_synthetic_csv_matches_cfpb_shape(tmp_path):
+    path = write_complaints_csv(tmp_path / "complaints.csv", 500, seed=1)
+    df, scanned = load_and_filter_complaints(path, verbose=False)
+
+    assert scanned == 500
+    assert 0 < len(df) < 500  # empty narratives and off-target products are dropped
+    assert df["Consumer complaint narrative"].notna().all()
+    assert pd.read_csv(path, nrows=0).columns.tolist() == CFPB_COLUMNS
+
+
+def test_compare_to_baseline_directions():
+    baseline = {"metrics": {"load_rows_per_sec": 1000, "retrieval_p99_ms": 10.0, "ingest_peak_rss_mb": 50}}
+    results = {"metrics": {"load_rows_per_sec": 700, "retrieval_p99_ms": 9.0, "ingest_peak_rss_mb": 70}}
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.2)
+    assert [r.split(":")[0] for r in regressions] == ["load_rows_per_sec", "ingest_peak_rss_mb"]
+
+
+def test_compare_to_baseline_tolerances_and_noise_floor():
+    baseline = {"metrics": {"retrieval_p50_ms": 0.3, "retrieval_p99_ms": 10.0, "answer_p50_ms": 10.0, "embed_docs_per_sec": 100}}
+    # Sub-millisecond p50 doubling is below the noise floor; p99 has a wider tolerance than p50
+    results = {"metrics": {"retrieval_p50_ms": 0.6, "retrieval_p99_ms": 14.0, "answer_p50_ms": 14.0, "embed_docs_per_sec": 75}}
+
+    regressions = compare_to_baseline(results, baseline)
+    assert [r.split(":")[0] for r in regressions] == ["answer_p50_ms"]
+
+
+def test_best_results_keeps_best_value_per_direction():
+    runs = [{"metrics": {"load_rows_per_sec": 100, "answer_p99_ms": 5.0}},
+            {"metrics": {"load_rows_per_sec": 150, "answer_p99_ms": 7.0}}]
+    assert best_results(runs)["metrics"] == {"load_rows_per_sec": 150, "answer_p99_ms": 5.0}
+
+
+def test_pipeline_benchmark_runs_offline(tmp_path):
+    pytest.importorskip("faiss")
+    pytest.importorskip("langchain_huggingface")
+    from scripts.benchmark_pipeline import run_benchmarks
+
+    results = run_benchmarks(300, tmp_path, n_queries=10, repeat=1)
+    assert results["config"]["documents"] > 0
+    for name in ("load_rows_per_sec", "embed_docs_per_sec", "ingest_peak_rss_mb", "retrieval_p99_ms", "answer_qps"):
+        assert results["metrics"][name] > 0
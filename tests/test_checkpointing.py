@@ -0,0 +1,63 @@
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+
+from src.checkpointing import BuildCheckpoint
+
+
+def test_resume_and_publish(tmp_path):
+    output_dir = tmp_path / "faiss_index"
+    embedding = FakeEmbeddings(size=8)
+    fingerprint = {"input": "complaints.parquet", "batch_size": 2}
+
+    checkpoint = BuildCheckpoint(output_dir, fingerprint)
+    checkpoint.save_embeddings(0, np.ones((2, 8)))
+    vectorstore = FAISS.from_embeddings([("a", [0.0] * 8), ("b", [1.0] * 8)], embedding)
+    checkpoint.save_index(vectorstore, completed=2)
+
+    # A restarted build with the same inputs picks up where it left off
+    resumed = BuildCheckpoint(output_dir, fingerprint)
+    assert resumed.has_embeddings(0) and not resumed.has_embeddings(1)
+    assert resumed.completed == 2
+    assert resumed.load_index(embedding).index.ntotal == 2
+
+    # Different inputs discard the stale checkpoint
+    assert BuildCheckpoint(output_dir, {**fingerprint, "batch_size": 4}).completed == 0
+
+
+def test_publish_swaps_in_new_store(tmp_path):
+    output_dir = tmp_path / "faiss_index"
+    embedding = FakeEmbeddings(size=8)
+
+    for texts in (["old"], ["new", "newer"]):
+        checkpoint = BuildCheckpoint(output_dir, {"texts": texts})
+        FAISS.from_texts(texts, embedding).save_local(str(checkpoint.final_dir))
+        checkpoint.publish()
+
+    assert FAISS.load_local(str(output_dir), embedding, allow_dangerous_deserialization=True).index.ntotal == 2
+    assert not checkpoint.staging_dir.exists()
+
+
+def test_publish_uses_relative_link_and_migrates_plain_dir(tmp_path):
+    output_dir = tmp_path / "store" / "faiss_index"
+    embedding = FakeEmbeddings(size=8)
+    FAISS.from_texts(["legacy"], embedding).save_local(str(output_dir))  # pre-versioning plain directory
+
+    checkpoint = BuildCheckpoint(output_dir, {"texts": ["new"]})
+    FAISS.from_texts(["new", "newer"], embedding).save_local(str(checkpoint.final_dir))
+    checkpoint.publish()
+
+    assert output_dir.is_symlink()
+    assert not os.path.isabs(os.readlink(output_dir))
+    assert any(p.name.startswith("legacy-") for p in (tmp_path / "store" / "faiss_index.versions").iterdir())
+
+    # The store still loads after its parent directory is moved
+    moved = tmp_path / "moved"
+    os.rename(tmp_path / "store", moved)
+    assert FAISS.load_local(str(moved / "faiss_index"), embedding, allow_dangerous_deserialization=True).index.ntotal == 2
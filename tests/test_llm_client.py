@@ -0,0 +1,79 @@
+import time
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("numpy")
+
+from src.llm_client import GenerationClient, CircuitBreaker, CircuitOpenError, GenerationError
+from scripts.fake_llm_server import start_fake_server
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**profile):
+        server, url = start_fake_server(**profile)
+        started.append(server)
+        return url
+
+    yield start
+    for server in started:
+        server.shutdown()
+
+
+def test_sends_chat_completions_payload(servers):
+    url = servers(latency_ms=1, jitter_ms=0)
+    client = GenerationClient([url], model="mistralai/Mistral-7B-Instruct-v0.2")
+    # The fake server echoes the length of the user message it received
+    text, usage = client.generate_with_usage("hello world")
+    assert text.startswith("Stub answer (11 prompt chars")
+    assert usage["prompt_tokens"] == 2 and usage["completion_tokens"] == len(text.split())
+    assert client.parameters["model"] == "mistralai/Mistral-7B-Instruct-v0.2"
+    client.close()
+
+
+def test_rag_records_reported_token_usage():
+    pytest.importorskip("langchain_huggingface")
+    from scripts.rag_pipeline import TOKENS, record_token_usage
+
+    before = TOKENS.count(kind="prompt", source="usage"), TOKENS.count(kind="completion", source="estimate")
+    record_token_usage("a long prompt " * 50, "short answer", {"prompt_tokens": 150})
+    assert TOKENS.count(kind="prompt", source="usage") == before[0] + 1
+    assert TOKENS.count(kind="completion", source="estimate") == before[1] + 1  # usage lacked completion_tokens
+
+
+def test_hedges_slow_primary_to_second_endpoint(servers):
+    slow = servers(latency_ms=2000, jitter_ms=0)
+    fast = servers(latency_ms=10, jitter_ms=0)
+    client = GenerationClient([slow, fast], deadline=5, hedge_initial_delay=0.1)
+
+    t0 = time.monotonic()
+    assert client.generate("hello").startswith("Stub answer")
+    assert time.monotonic() - t0 < 1.0
+    client.close()
+
+
+def test_deadline_and_circuit_breaker(servers):
+    slow = servers(latency_ms=1000, jitter_ms=0)
+    client = GenerationClient([slow], deadline=0.2, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    for _ in range(2):
+        with pytest.raises(GenerationError):
+            client.generate("hello")
+    assert client.breaker.state == "open"
+
+    t0 = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        client.generate("hello")
+    assert time.monotonic() - t0 < 0.05
+    client.close()
+
+
+def test_breaker_half_open_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()        # single trial call
+    assert not breaker.allow()    # others still fail fast
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
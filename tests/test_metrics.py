@@ -0,0 +1,42 @@
+import urllib.request
+
+from src.metrics import MetricsRegistry, StageTimer, start_metrics_server
+
+
+def test_histogram_and_counter_exposition():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage latency.", ["stage"], buckets=(0.1, 1.0))
+    requests = registry.counter("requests_total", "Requests.", ["route"])
+
+    latency.observe(0.05, stage="embed")
+    latency.observe(0.5, stage="embed")
+    requests.inc(route="rag")
+    assert registry.counter("requests_total", "Requests.", ["route"]) is requests
+
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="embed",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="embed",le="+Inf"} 2' in text
+    assert 'stage_seconds_count{stage="embed"} 2' in text
+    assert 'requests_total{route="rag"} 1' in text
+
+
+def test_stage_timer_records_spans():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency.", ["stage"])
+    timer = StageTimer(histogram)
+    with timer.span("search"):
+        pass
+    assert set(timer.timings_ms) == {"search"}
+    assert histogram.count(stage="search") == 1
+
+
+def test_metrics_endpoint():
+    registry = MetricsRegistry()
+    registry.gauge("index_vectors", "Vectors.").set(42)
+    server = start_metrics_server(port=0, host="127.0.0.1", registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode()
+    finally:
+        server.shutdown()
+    assert "index_vectors 42" in body
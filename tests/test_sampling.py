@@ -0,0 +1,41 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from src.sampling import build_filter, stream_stratified_sample
+
+
+@pytest.fixture
+def parquet_path(tmp_path):
+    n = 5000
+    df = pd.DataFrame({
+        "Complaint ID": [str(i) for i in range(n)],
+        "Product": ["Credit card" if i % 5 else "Money transfers" for i in range(n)],
+        "Issue": "Fees or interest",
+        "Company": "ACME",
+        "Date received": [f"202{i % 4}-01-15" for i in range(n)],
+        "cleaned_narrative": "some text",
+        "Unused": 0,
+    })
+    path = tmp_path / "complaints.parquet"
+    df.to_parquet(path, index=False, row_group_size=700)
+    return path
+
+
+def test_sample_is_stratified_and_deterministic(parquet_path):
+    sample = stream_stratified_sample(parquet_path, 500, columns=["Complaint ID", "cleaned_narrative"], batch_size=256)
+    assert sample["Product"].value_counts().to_dict() == {"Credit card": 400, "Money transfers": 100}
+    assert sample["Complaint ID"].is_unique
+    assert "Unused" not in sample.columns
+
+    again = stream_stratified_sample(parquet_path, 500, columns=["Complaint ID", "cleaned_narrative"], batch_size=256)
+    assert sample["Complaint ID"].tolist() == again["Complaint ID"].tolist()
+
+
+def test_filters_are_applied(parquet_path):
+    filters = build_filter(products=["Money transfers"], date_from="2022-01-01")
+    sample = stream_stratified_sample(parquet_path, 10_000, filters=filters)
+    assert len(sample) == 500  # 1000 money transfers, half dated 2022 or later
+    assert set(sample["Product"]) == {"Money transfers"}
+    assert sample["Date received"].min() >= "2022-01-01"
@@ -0,0 +1,72 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+faiss = pytest.importorskip("faiss")
+
+from src.vector_compression import (
+    index_factory_string,
+    compress_index,
+    compression_report,
+    _drop_self,
+    save_compression_config,
+    load_compression_config,
+)
+
+
+@pytest.fixture
+def flat_index():
+    rng = np.random.default_rng(0)
+    # Low-rank signal plus noise, like sentence embeddings (isotropic noise has no structure for PCA to keep)
+    latent = rng.standard_normal((2000, 16)) @ rng.standard_normal((16, 64))
+    x = (latent + 0.1 * rng.standard_normal((2000, 64))).astype(np.float32)
+    index = faiss.IndexFlatL2(64)
+    index.add(x)
+    return index
+
+
+def test_factory_string():
+    assert index_factory_string() == "Flat"
+    assert index_factory_string("int8", 32) == "PCA32,SQ8"
+    with pytest.raises(ValueError):
+        index_factory_string("int4")
+
+
+@pytest.mark.parametrize("dtype,pca_dim", [("float16", 0), ("int8", 0), ("float32", 32)])
+def test_compressed_index_keeps_order_and_recall(flat_index, dtype, pca_dim):
+    compressed = compress_index(flat_index, dtype, pca_dim, batch_size=300)
+    assert compressed.ntotal == flat_index.ntotal
+    assert compressed.d == flat_index.d  # queries stay 384-d (here 64-d) at the API
+
+    report = compression_report(flat_index, compressed, n_queries=100, k=5)
+    assert report["candidate"]["memory_mb"] < report["reference"]["memory_mb"]
+    # float16 / int8 only lose quantization precision; PCA32 keeps the fixture's full
+    # rank-16 signal and drops only noise dimensions, so neighbours barely change either way
+    assert report["recall@5"] >= 0.95
+
+
+def test_pca_dim_larger_than_training_set_is_rejected():
+    rng = np.random.default_rng(0)
+    small = faiss.IndexFlatL2(64)
+    small.add(rng.standard_normal((20, 64)).astype(np.float32))
+    with pytest.raises(ValueError, match="training vectors"):
+        compress_index(small, "float32", 32)
+
+
+def test_report_holds_out_query_vectors(flat_index):
+    ids = np.array([[7, 1, 2, 3, 4, 5], [0, 1, 2, 3, 4, 5]])
+    assert _drop_self(ids, np.array([7, 9]), 5).tolist() == [[1, 2, 3, 4, 5], [0, 1, 2, 3, 4]]
+
+    report = compression_report(flat_index, flat_index, n_queries=50, k=5)
+    assert report["held_out"] and report["recall@5"] == 1.0
+
+    rng = np.random.default_rng(1)
+    queries = rng.standard_normal((20, 64)).astype(np.float32)
+    report = compression_report(flat_index, flat_index, k=5, queries=queries)
+    assert report["n_queries"] == 20 and not report["held_out"] and report["recall@5"] == 1.0
+
+
+def test_config_round_trip(tmp_path):
+    assert load_compression_config(tmp_path)["factory"] == "Flat"
+    save_compression_config(tmp_path, "float16", 128, report={"recall@5": 0.99})
+    assert load_compression_config(tmp_path)["factory"] == "PCA128,SQfp16"
+    assert (tmp_path / "compression_report.json").exists()